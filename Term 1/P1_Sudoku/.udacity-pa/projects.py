@@ -7,7 +7,8 @@ nanodegree = 'nd889'
 projects = ['sudoku']
 
 def submit(args):
-  filenames = ['solution.py', 'README.md']
+  # solution.py imports the topology and the alternative engines
+  filenames = ['solution.py', 'sudoku_topology.py', 'sudoku_bitmask.py', 'sudoku_dlx.py', 'README.md']
 
   udacity.submit(nanodegree, projects[0], filenames, 
                  environment = args.environment,
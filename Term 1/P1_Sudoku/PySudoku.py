@@ -1,58 +1,119 @@
-import sys, os, random, pygame
-sys.path.append(os.path.join("objects"))
+import sys, os, pygame
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(here, "objects"))
 import SudokuSquare
 from GameResources import *
 
 digits = '123456789'
 rows = 'ABCDEFGHI'
 
+size = width, height = 700, 700
+square_size = 45, 40
 
-def play(values_list):
-    pygame.init()
 
+def square_origin(x, y):
+    """The top left corner of the square in column x and row y of the board image."""
+    if x in (0, 1, 2):  startX = (x * 57) + 38
+    if x in (3, 4, 5):  startX = (x * 57) + 99
+    if x in (6, 7, 8):  startX = (x * 57) + 159
 
-    size = width, height = 700, 700
-    screen = pygame.display.set_mode(size)
+    if y in (0, 1, 2):  startY = (y * 57) + 35
+    if y in (3, 4, 5):  startY = (y * 57) + 100
+    if y in (6, 7, 8):  startY = (y * 57) + 165
+    return startX, startY
 
-    background_image = pygame.image.load("./images/sudoku-board-bare.jpg").convert()
 
-    clock = pygame.time.Clock()
+def square_number(string_number):
+    """The number shown for a box value, None while it is unsolved."""
+    if len(string_number) > 1 or string_number == '' or string_number == '.':
+        return None
+    return int(string_number)
 
-    # The puzzleNumber sets a seed so either generate
-    # a random number to fill in here or accept user
-    # input for a duplicatable puzzle.
 
-    for values in values_list:
-        pygame.event.pump()
-        theSquares = []
-        initXLoc = 0
-        initYLoc = 0
-        startX, startY, editable, number = 0, 0, "N", 0
+class Renderer(object):
+    """
+    Draws successive grids onto a surface, redrawing only the squares whose
+    number changed since the previous grid.
+
+    Args:
+        surface: the display surface, or any Surface when running headless.
+    """
+
+    def __init__(self, surface):
+        self.surface = surface
+        background = pygame.image.load(os.path.join(here, "images", "sudoku-board-bare.jpg"))
+        # convert() needs a display mode, which headless replays never set
+        self.background = background.convert() if pygame.display.get_surface() else background
+        self.shown = {}
+        surface.blit(self.background, (0, 0))
+
+    def draw(self, values):
+        """Draw a grid. Returns the rects of the surface that changed."""
+        dirty = []
         for y in range(9):
             for x in range(9):
-                if x in (0, 1, 2):  startX = (x * 57) + 38
-                if x in (3, 4, 5):  startX = (x * 57) + 99
-                if x in (6, 7, 8):  startX = (x * 57) + 159
-
-                if y in (0, 1, 2):  startY = (y * 57) + 35
-                if y in (3, 4, 5):  startY = (y * 57) + 100
-                if y in (6, 7, 8):  startY = (y * 57) + 165
-                col = digits[x]
-                row = rows[y]
-                string_number = values[row + col]
-                if len(string_number) > 1 or string_number == '' or string_number == '.':
-                    number = None
-                else:
-                    number = int(string_number)
-                theSquares.append(SudokuSquare.SudokuSquare(number, startX, startY, editable, x, y))
-
-        screen.blit(background_image, (0, 0))
-        for num in theSquares:
-            num.draw()
+                box = rows[y] + digits[x]
+                number = square_number(values[box])
+                if box in self.shown and self.shown[box] == number:
+                    continue
+                self.shown[box] = number
+                startX, startY = square_origin(x, y)
+                area = pygame.Rect((startX, startY), square_size)
+                # Clear the old square first; its rounded corners show the board through
+                self.surface.blit(self.background, area, area)
+                SudokuSquare.SudokuSquare(number, startX, startY, "N", x, y).draw(self.surface)
+                dirty.append(area)
+        return dirty
+
 
+def play(values_list, fps=5, step=1, headless=False, output='frames'):
+    """
+    Replay a list of grids.
+    Args:
+        values_list(list): grids in dictionary form, in the order they are shown.
+        fps(int): frames shown per second at most; 0 replays as fast as it draws.
+        step(int): show every step-th grid only, always including the last one.
+        headless(bool): save the frames as numbered PNG images instead of opening a window.
+        output(str): the directory the headless frames are saved to.
+    Returns:
+        The paths of the saved images when headless; otherwise keeps the
+        window showing the final grid until it is closed.
+    Raises:
+        ValueError: if step is less than 1.
+    """
+    if step < 1:
+        raise ValueError("step must be at least 1, got {}".format(step))
+    if headless:
+        pygame.font.init()
+        screen = pygame.Surface(size)
+        if not os.path.isdir(output):
+            os.makedirs(output)
+    else:
+        pygame.init()
+        screen = pygame.display.set_mode(size)
+
+    renderer = Renderer(screen)
+    if not headless:
         pygame.display.flip()
-        pygame.display.update()
-        clock.tick(5)
+
+    clock = pygame.time.Clock()
+    paths = []
+
+    for i, values in enumerate(values_list):
+        if i % step and i != len(values_list) - 1:
+            continue
+        dirty = renderer.draw(values)
+        if headless:
+            path = os.path.join(output, 'frame_{:05d}.png'.format(len(paths)))
+            pygame.image.save(screen, path)
+            paths.append(path)
+            continue
+        pygame.event.pump()
+        pygame.display.update(dirty)
+        clock.tick(fps)
+
+    if headless:
+        return paths
 
     # leave game showing until closed by user
     while True:
@@ -63,4 +124,4 @@ def play(values_list):
 
 if __name__ == "__main__":
     main()
-    sys.exit()
\ No newline at end of file
+    sys.exit()
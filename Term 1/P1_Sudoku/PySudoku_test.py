@@ -0,0 +1,57 @@
+import os
+import shutil
+import solution
+import solution_test
+import tempfile
+import unittest
+
+try:
+    import pygame
+    import PySudoku
+    import visualize
+except ImportError:
+    pygame = None
+
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestHeadlessReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.output = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output)
+
+    def frames(self):
+        recorder = solution.Recorder('delta')
+        solution.solve(solution_test.TestDiagonalSudoku.diagonal_grid, recorder=recorder)
+        values = dict(recorder.initial)
+        frames = []
+        for box, value in recorder.frames:
+            values[box] = value
+            frames.append(values.copy())
+        return frames
+
+    def test_redraws_changed_squares(self):
+        frames = self.frames()
+        renderer = PySudoku.Renderer(pygame.Surface(PySudoku.size))
+        self.assertEqual(len(renderer.draw(frames[0])), 81)
+        changed = sum(frames[0][box] != frames[1][box] for box in frames[0])
+        self.assertEqual(len(renderer.draw(frames[1])), changed)
+        self.assertEqual(renderer.draw(frames[1]), [])
+
+    def test_image_sequence(self):
+        recorder = solution.Recorder('delta')
+        solution.solve(solution_test.TestDiagonalSudoku.diagonal_grid, recorder=recorder)
+        paths = visualize.visualize_assignments(recorder, headless=True, output=self.output, step=10)
+        self.assertTrue(paths)
+        self.assertEqual(sorted(os.listdir(self.output)), [os.path.basename(path) for path in paths])
+        self.assertEqual(pygame.image.load(paths[-1]).get_size(), PySudoku.size)
+
+    def test_invalid_step(self):
+        for step in (0, -1):
+            with self.assertRaises(ValueError):
+                PySudoku.play(self.frames(), headless=True, output=self.output, step=step)
+
+if __name__ == '__main__':
+    unittest.main()
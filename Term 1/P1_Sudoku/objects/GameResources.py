@@ -1,5 +1,10 @@
 import os, pygame
 
+# SysFont scans the installed fonts on every call and rendering a glyph
+# rasterises it again, so both are done once per distinct request
+_fonts = {}
+_glyphs = {}
+
 def load_image(name):
     """A better load of images."""
     fullname = os.path.join("images", name)
@@ -12,3 +17,19 @@ def load_image(name):
     except pygame.error:
         print("Oops! Could not load image:", fullname)
     return image, image.get_rect()
+
+
+def load_font(name, size):
+    """A SysFont, loaded once per name and size."""
+    key = (name, size)
+    if key not in _fonts:
+        _fonts[key] = pygame.font.SysFont(name, size)
+    return _fonts[key]
+
+
+def render_text(name, size, text, color):
+    """The surface of text rendered in a SysFont, rendered once per text and color."""
+    key = (name, size, text, color)
+    if key not in _glyphs:
+        _glyphs[key] = load_font(name, size).render(text, 1, color)
+    return _glyphs[key]
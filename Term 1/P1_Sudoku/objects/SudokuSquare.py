@@ -2,6 +2,12 @@ import pygame
 
 from pygame import *
 
+from GameResources import load_font, render_text
+
+# Rounded rectangles by (size, color, radius): smoothscaling the corners is the
+# slowest part of drawing a square, and a board only ever uses a few of them
+_tiles = {}
+
 def AAfilledRoundedRect(surface,rect,color,radius=0.4):
 
     """
@@ -14,11 +20,17 @@ def AAfilledRoundedRect(surface,rect,color,radius=0.4):
     """
 
     rect         = Rect(rect)
+    key          = (rect.size, tuple(color), radius)
+    if key not in _tiles:
+        _tiles[key] = _roundedRect(rect.size, color, radius)
+    return surface.blit(_tiles[key], rect.topleft)
+
+def _roundedRect(size,color,radius):
+
+    rect         = Rect((0,0),size)
     color        = Color(*color)
     alpha        = color.a
     color.a      = 0
-    pos          = rect.topleft
-    rect.topleft = 0,0
     rectangle    = Surface(rect.size,SRCALPHA)
 
     circle       = Surface([min(rect.size)*3]*2,SRCALPHA)
@@ -39,7 +51,7 @@ def AAfilledRoundedRect(surface,rect,color,radius=0.4):
     rectangle.fill(color,special_flags=BLEND_RGBA_MAX)
     rectangle.fill((255,255,255,alpha),special_flags=BLEND_RGBA_MIN)
 
-    return surface.blit(rectangle,pos)
+    return rectangle
 
 class SudokuSquare:
     """A sudoku square class."""
@@ -51,8 +63,8 @@ class SudokuSquare:
             number = ""
             self.color = (255, 255, 255)
         # print("FONTS", pygame.font.get_fonts())
-        self.font = pygame.font.SysFont('opensans', 21)
-        self.text = self.font.render(number, 1, (255, 255, 255))
+        self.font = load_font('opensans', 21)
+        self.text = render_text('opensans', 21, number, (255, 255, 255))
         self.textpos = self.text.get_rect()
         self.textpos = self.textpos.move(offsetX + 17, offsetY + 4)
 
@@ -70,8 +82,9 @@ class SudokuSquare:
         self.offsetX = offsetX
         self.offsetY = offsetY
 
-    def draw(self):
-        screen = pygame.display.get_surface()
+    def draw(self, screen=None):
+        if screen is None:
+            screen = pygame.display.get_surface()
         AAfilledRoundedRect(screen, (self.offsetX, self.offsetY, 45, 40), self.color)
 
         # screen.blit(self.collide, self.collideRect)
@@ -104,7 +117,7 @@ class SudokuSquare:
             number = ""
         
         if self.edit == "Y":
-            self.text = self.font.render(number, 1, (0, 0, 0))
+            self.text = render_text('opensans', 21, number, (0, 0, 0))
             self.draw()
             return 0
         else:
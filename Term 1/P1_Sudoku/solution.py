@@ -1,85 +1,340 @@
 import pprint
+import sudoku_bitmask
+import sudoku_dlx
+from collections import deque
+from itertools import combinations
+from time import perf_counter
+from sudoku_topology import DIAGONAL, get_topology
+# Re-exported: cross() used to be defined here, and callers still import it from solution
+from sudoku_topology import cross
 pp = pprint.PrettyPrinter(indent=4)
 
-assignments = []
+class Recorder(object):
+    """
+    Records the assignments made while solving, for visualize.py.
+    Pass one to solve() explicitly; nothing is recorded otherwise.
+
+    Modes:
+        'off'   - record nothing.
+        'ring'  - keep full snapshots of the grid after each of the last `maxlen` assignments
+                  and backtracks.
+        'delta' - keep the starting grid in `initial` and each assignment as a (box, value) frame.
+                  Backtracking is recorded as (box, value) frames too, putting back the value
+                  of every box a dead branch had solved or emptied, so replaying the frames
+                  in order on top of `initial` gives the solved boxes of the grid the search
+                  held at every step.
+    Only assignments that solve or empty a box are recorded.
+    """
 
-def assign_value(values, box, value):
+    def __init__(self, mode='delta', maxlen=None):
+        if mode not in ('off', 'ring', 'delta'):
+            raise ValueError("Unknown recorder mode: {}".format(mode))
+        if mode == 'ring' and not maxlen:
+            raise ValueError("A ring recorder needs a positive maxlen")
+        self.mode = mode
+        self.initial = None
+        self.frames = deque(maxlen=maxlen if mode == 'ring' else None)
+
+    def start(self, values):
+        "Remember the grid the frames are applied to."
+        if self.mode == 'delta':
+            self.initial = dict(values)
+
+    def record(self, values, box, value):
+        "Record that box was just assigned value in values."
+        if self.mode == 'ring':
+            self.frames.append(values.copy())
+        elif self.mode == 'delta':
+            self.frames.append((box, value))
+
+    def backtrack(self, values, restored):
+        "Record that search backtracked to values, putting back the (box, value) pairs in restored."
+        if self.mode == 'ring':
+            self.frames.append(values.copy())
+        elif self.mode == 'delta':
+            self.frames.extend(restored)
+
+def assign_value(values, box, value, recorder=None):
     """
     Please use this function to update your values dictionary!
     Assigns a value to a given box. If it updates the board record it.
     """
 
-    # Don't waste memory appending actions that don't actually change any values
+    # Don't waste memory recording actions that don't actually change any values
     if values[box] == value:
         return values
 
     values[box] = value
-    if len(value) == 1:
-        assignments.append(values.copy())
+    # A box running out of values is recorded too, or a replay would keep showing its digit
+    if recorder is not None and len(value) <= 1:
+        recorder.record(values, box, value)
     return values
 
-def naked_twins(values):
+class TrailValues(dict):
+    """
+    A values dictionary that records every change on a trail, so that search_trail()
+    can undo back to an earlier state instead of copying the whole grid per branch.
+    """
+
+    def __init__(self, values):
+        dict.__init__(self, values)
+        self.trail = []
+
+    def __setitem__(self, box, value):
+        old = self[box]
+        if old != value:
+            self.trail.append((box, old))
+            dict.__setitem__(self, box, value)
+
+    def mark(self):
+        "Return a position on the trail to undo() back to."
+        return len(self.trail)
+
+    def undo(self, mark, recorder=None):
+        "Revert every change recorded since mark, recording the backtrack if a recorder is given."
+        trail = self.trail
+        restored = []
+        while len(trail) > mark:
+            box, value = trail.pop()
+            # Only solved (or emptied) boxes can differ from what the recorder last saw
+            if recorder is not None and len(self[box]) <= 1:
+                restored.append((box, value))
+            dict.__setitem__(self, box, value)
+        if recorder is not None:
+            recorder.backtrack(self, restored)
+
+class RankedTrailValues(TrailValues):
+    """
+    A TrailValues that also keeps its boxes in buckets by number of candidates, updated
+    on every change and undo, so the box with the fewest candidates is found without
+    scanning the grid.
+    """
+
+    def __init__(self, values, topology=DIAGONAL):
+        TrailValues.__init__(self, values)
+        self.buckets = [set() for _ in range(len(topology.digits) + 1)]
+        for box, value in self.items():
+            self.buckets[len(value)].add(box)
+
+    def __setitem__(self, box, value):
+        old = self[box]
+        if old != value:
+            self.buckets[len(old)].discard(box)
+            self.buckets[len(value)].add(box)
+            self.trail.append((box, old))
+            dict.__setitem__(self, box, value)
+
+    def undo(self, mark, recorder=None):
+        "Revert every change recorded since mark, recording the backtrack if a recorder is given."
+        trail = self.trail
+        buckets = self.buckets
+        restored = []
+        while len(trail) > mark:
+            box, value = trail.pop()
+            if recorder is not None and len(self[box]) <= 1:
+                restored.append((box, value))
+            buckets[len(self[box])].discard(box)
+            buckets[len(value)].add(box)
+            dict.__setitem__(self, box, value)
+        if recorder is not None:
+            recorder.backtrack(self, restored)
+
+class Branching(object):
+    """
+    Chooses the box search() branches on, always one with the fewest candidates left
+    (minimum remaining values), and the order its candidates are tried in.
+    Pass one to solve(); MRV with ties broken by box name and digits tried in order
+    is the default.
+
+    Args:
+        degree(bool): break ties by the most unsolved peers, i.e. branch on the box
+            constraining the most others.
+        lcv(bool): try the least constraining values first, those that the fewest
+            unsolved peers still have as a candidate.
+    """
+
+    def __init__(self, degree=False, lcv=False):
+        self.degree = degree
+        self.lcv = lcv
+
+    def select(self, values, topology=DIAGONAL):
+        "Return the box to branch on, or None if every box is solved."
+        buckets = getattr(values, 'buckets', None)
+        if buckets is not None:
+            # Kept up to date by RankedTrailValues
+            tied = next((bucket for bucket in buckets[2:] if bucket), None)
+            if tied is None:
+                return None
+        else:
+            unsolved = [(len(values[s]), s) for s in topology.boxes if len(values[s]) > 1]
+            if not unsolved:
+                return None
+            fewest = min(unsolved)[0]
+            tied = [s for n, s in unsolved if n == fewest]
+        if not self.degree or len(tied) == 1:
+            return min(tied)
+        peers = topology.peers
+        return min(tied, key=lambda s: (-sum(1 for p in peers[s] if len(values[p]) > 1), s))
+
+    def order(self, values, box, topology=DIAGONAL):
+        "Return the candidates of box in the order they should be tried."
+        if not self.lcv:
+            return values[box]
+        peer_values = [values[p] for p in topology.peers[box] if len(values[p]) > 1]
+        return sorted(values[box], key=lambda d: (sum(1 for v in peer_values if d in v), d))
+
+MRV = Branching()
+
+def naked_subsets(values, topology=DIAGONAL, recorder=None, size=2):
+    """Eliminate values using the naked subsets strategy: whenever `size` boxes of a unit
+    share exactly `size` candidates between them, those candidates can't go anywhere else
+    in that unit.
+    Args:
+        values(dict): a dictionary of the form {'box_name': '123456789', ...}
+        topology(Topology): the shared board topology, diagonal by default
+        size(int): 2 for naked twins, 3 for triples, 4 for quads
+
+    Returns:
+        the values dictionary with the naked subsets eliminated from their units.
+    """
+    for unit in topology.unitlist:
+        if size == 2:
+            # Bucket the two-candidate boxes of the unit by their candidates
+            buckets = {}
+            for box in unit:
+                if len(values[box]) == 2:
+                    buckets.setdefault(values[box], []).append(box)
+            subsets = [(digits, boxes) for digits, boxes in buckets.items() if len(boxes) == 2]
+        else:
+            candidates = [box for box in unit if 1 < len(values[box]) <= size]
+            subsets = []
+            for boxes in combinations(candidates, size):
+                digits = set(''.join(values[box] for box in boxes))
+                if len(digits) == size:
+                    subsets.append((digits, boxes))
+
+        # Eliminate the subset digits from the rest of the unit
+        for digits, boxes in subsets:
+            for box in unit:
+                if box not in boxes:
+                    remaining = ''.join(d for d in values[box] if d not in digits)
+                    assign_value(values, box, remaining, recorder)
+    return values
+
+def naked_twins(values, topology=DIAGONAL, recorder=None):
     """Eliminate values using the naked twins strategy.
     Args:
         values(dict): a dictionary of the form {'box_name': '123456789', ...}
+        topology(Topology): the shared board topology, diagonal by default
 
     Returns:
         the values dictionary with the naked twins eliminated from peers.
     """
+    return naked_subsets(values, topology, recorder, size=2)
 
-    # Set some global variables // Since solution_test doesn't include parameters
-    rows = 'ABCDEFGHI'
-    cols = '123456789'
-    boxes = cross(rows, cols)
-    row_units = [cross(r, cols) for r in rows]
-    column_units = [cross(rows, c) for c in cols]
-    square_units = [cross(rs, cs) for rs in ('ABC', 'DEF', 'GHI') for cs in ('123', '456', '789')]
-    diagonal_units_a = [[rows[i]+cols[i] for i in range(0, len(rows))]]
-    diagonal_units_b = [[rows[(len(rows)-1-i)]+cols[i] for i in range(0, len(rows))]]
-    unitlist = row_units + column_units + square_units + diagonal_units_a + diagonal_units_b
-    units = dict((s, [u for u in unitlist if s in u]) for s in boxes)
-    peers = dict((s, set(sum(units[s], [])) - set([s])) for s in boxes)
-
-    # Find all instances of naked twins
-    #print('-----')
-    #print(values)
-    potential_twins = [box for box in values.keys() if len(values[box]) == 2]
-    #print(potential_twins)
-
-    # Loop through potential twins
-    for box in potential_twins:
-        confirmed_twin = None
-        #print(values[box])
-        for peer in peers[box]:
-            if(len(values[peer])==2):
-                #print(box + ':' + values[box] + '-->' + peer + ':' + values[peer])
-                if values[box] == values[peer]:
-                    #print('found a twin')
-                    confirmed_twin = peer
-                    break
-        if confirmed_twin:
-            #print('confirmed twin:' + box + ':' + confirmed_twin)
-            box_vals = [c for c in values[box]]
-            for unit in unitlist:
-                if box in unit and confirmed_twin in unit:
-                    for u in unit:
-                        #print('u:' + u + ':' + values[u])
-                        if u != box and u != confirmed_twin:
-                            u_vals = [c for c in values[u]]
-                            for val in u_vals:
-                                if val in box_vals:
-                                    values[u] = values[u].replace(val, '')
-                        #print('-->' + values[u])
-    #print(values)
-    # Eliminate the naked twins as possibilities for their peers
+def naked_triples(values, topology=DIAGONAL, recorder=None):
+    "Eliminate values using naked triples, see naked_subsets()."
+    return naked_subsets(values, topology, recorder, size=3)
 
+def naked_quads(values, topology=DIAGONAL, recorder=None):
+    "Eliminate values using naked quads, see naked_subsets()."
+    return naked_subsets(values, topology, recorder, size=4)
+
+def _digit_places(values, unit):
+    """
+    Map every digit not yet placed in a unit to the unsolved boxes of the unit it still fits in.
+    Digits already solved in the unit are left out: they are settled, even while a stale
+    candidate of theirs is still waiting for eliminate() in another box.
+    """
+    placed = set(values[box] for box in unit if len(values[box]) == 1)
+    places = {}
+    for box in unit:
+        value = values[box]
+        if len(value) > 1:
+            for digit in value:
+                if digit not in placed:
+                    places.setdefault(digit, []).append(box)
+    return places
+
+def hidden_subsets(values, topology=DIAGONAL, recorder=None, size=2):
+    """Eliminate values using the hidden subsets strategy: whenever `size` digits of a unit
+    only fit in the same `size` boxes, those boxes can't hold any other digit.
+    Args:
+        values(dict): a dictionary of the form {'box_name': '123456789', ...}
+        topology(Topology): the shared board topology, diagonal by default
+        size(int): 2 for hidden pairs, 3 for triples
+
+    Returns:
+        the values dictionary with the other candidates of the hidden subsets eliminated.
+    """
+    for unit in topology.unitlist:
+        # Digits with a single place are hidden singles, left to only_choice()
+        places = dict((digit, dplaces) for digit, dplaces in _digit_places(values, unit).items()
+                      if 1 < len(dplaces) <= size)
+        if len(places) < size:
+            continue
+        for digits in combinations(places, size):
+            boxes = set()
+            for digit in digits:
+                boxes.update(places[digit])
+            if len(boxes) == size:
+                for box in boxes:
+                    assign_value(values, box, ''.join(d for d in values[box] if d in digits), recorder)
+    return values
+
+def hidden_pairs(values, topology=DIAGONAL, recorder=None):
+    "Eliminate values using hidden pairs, see hidden_subsets()."
+    return hidden_subsets(values, topology, recorder, size=2)
+
+def hidden_triples(values, topology=DIAGONAL, recorder=None):
+    "Eliminate values using hidden triples, see hidden_subsets()."
+    return hidden_subsets(values, topology, recorder, size=3)
+
+def _intersection_removal(values, topology, recorder, pointing):
+    """
+    For every square and line sharing boxes, whenever a digit of one of them only fits
+    in the shared boxes, remove it from the rest of the other one.
+    With pointing=True the digit is confined within the square, otherwise within the line.
+    """
+    unitlist = topology.unitlist
+    # Removals only ever shrink these, so places found stale are still a superset
+    # of the real ones and the test below stays sound
+    places = [_digit_places(values, unit) for unit in unitlist]
+    for square, line, shared in topology.intersections:
+        source, target = (square, line) if pointing else (line, square)
+        for digit, dplaces in places[source].items():
+            if len(dplaces) < 2 or any(box not in shared for box in dplaces):
+                continue
+            for box in unitlist[target]:
+                if box not in shared and digit in values[box]:
+                    assign_value(values, box, values[box].replace(digit, ''), recorder)
     return values
 
-def cross(A, B):
-    "Cross product of elements in A and elements in B."
-    return [s + t for s in A for t in B]
+def pointing_pairs(values, topology=DIAGONAL, recorder=None):
+    """Eliminate values using pointing pairs (and triples): whenever a digit only fits in
+    the boxes a square shares with a line, it can't go anywhere else on that line.
+    Args:
+        values(dict): a dictionary of the form {'box_name': '123456789', ...}
+        topology(Topology): the shared board topology, diagonal by default
+
+    Returns:
+        the values dictionary with the pointed digits eliminated from the rest of their lines.
+    """
+    return _intersection_removal(values, topology, recorder, pointing=True)
+
+def box_line_reduction(values, topology=DIAGONAL, recorder=None):
+    """Eliminate values using box/line reduction: whenever a digit only fits in the boxes
+    a line shares with a square, it can't go anywhere else in that square.
+    Args:
+        values(dict): a dictionary of the form {'box_name': '123456789', ...}
+        topology(Topology): the shared board topology, diagonal by default
+
+    Returns:
+        the values dictionary with the confined digits eliminated from the rest of their squares.
+    """
+    return _intersection_removal(values, topology, recorder, pointing=False)
 
-def grid_values(grid, boxes):
+def grid_values(grid, topology=DIAGONAL):
     """
     Convert grid into a dict of {square: char} with '123456789' for empties.
     Args:
@@ -89,151 +344,441 @@ def grid_values(grid, boxes):
             Keys: The boxes, e.g., 'A1'
             Values: The value in each box, e.g., '8'. If the box has no value, then the value will be '123456789'.
     """
-    chars = []
-    digits = '123456789'
-    for c in grid:
-        if c in digits:
-            chars.append(c)
-        if c == '.':
-            chars.append(digits)
-    assert len(chars) == 81
-    return dict(zip(boxes, chars))
+    digits = topology.digits
+    chars = [c if c != '.' else digits for c in grid if c in digits or c == '.']
+    assert len(chars) == len(topology.boxes)
+    return dict(zip(topology.boxes, chars))
 
-def display(values):
+def display(values, topology=DIAGONAL):
     """
     Display the values as a 2-D grid.
     Args:
         values(dict): The sudoku in dictionary form
     """
-    rows = 'ABCDEFGHI'
-    cols = '123456789'
-
-    boxes = cross(rows, cols)
-
-    width = 1 + max(len(values[s]) for s in boxes)
-    line = '+'.join(['-' * (width * 3)] * 3)
-    for r in rows:
-        print(''.join(values[r + c].center(width) + ('|' if c in '36' else '')
-                      for c in cols))
-        if r in 'CF': print(line)
+    rows = topology.rows
+    cols = topology.cols
+    size = topology.size
+
+    # Square borders go after every size-th row and column but the last
+    borders = set(range(size - 1, topology.side - 1, size))
+    width = 1 + max(len(values[s]) for s in topology.boxes)
+    line = '+'.join(['-' * (width * size)] * size)
+    lines = []
+    for i, r in enumerate(rows):
+        lines.append(''.join([values[r + c].center(width) + ('|' if j in borders else '')
+                              for j, c in enumerate(cols)]))
+        if i in borders: lines.append(line)
+    print('\n'.join(lines))
     return
 
-def eliminate(values, peers):
+def eliminate(values, topology=DIAGONAL, recorder=None):
     """
     Go through all the boxes, and whenever there is a box with a value, eliminate this value from the values of all its peers.
     Input: A sudoku in dictionary form.
     Output: The resulting sudoku in dictionary form.
     """
+    peers = topology.peers
     solved_values = [box for box in values.keys() if len(values[box]) == 1]
     for box in solved_values:
         digit = values[box]
         for peer in peers[box]:
-            values[peer] = values[peer].replace(digit, '')
+            assign_value(values, peer, values[peer].replace(digit, ''), recorder)
     return values
 
-def only_choice(values, unitlist):
+def only_choice(values, topology=DIAGONAL, recorder=None):
     """
     Go through all the units, and whenever there is a unit with a value that only fits in one box, assign the value to this box.
     Input: A sudoku in dictionary form.
     Output: The resulting sudoku in dictionary form.
     """
-    for unit in unitlist:
-        for digit in '123456789':
+    for unit in topology.unitlist:
+        for digit in topology.digits:
             dplaces = [box for box in unit if digit in values[box]]
             #print(dplaces)
             if len(dplaces) == 1:
-                values[dplaces[0]] = digit
+                assign_value(values, dplaces[0], digit, recorder)
+    return values
+
+def candidate_count(values):
+    "Count the candidates left in every box of values."
+    return sum(len(v) for v in values.values())
+
+def solved_count(values):
+    "Count the boxes of values with a single candidate."
+    return len([box for box in values.keys() if len(values[box]) == 1])
+
+def _apply(strategy, values, topology, recorder, stats):
+    "Apply a strategy, accounting for it in stats if given."
+    if stats is None:
+        return strategy(values, topology, recorder)
+    return stats.measure(strategy, candidate_count, values, topology, recorder)
+
+def propagate(values, topology=DIAGONAL, recorder=None, stats=None, changed=None):
+    """
+    Apply eliminate(), only_choice() and naked_twins() incrementally, driven by a work queue.
+    When a box is solved only its peers are updated, and only the units in which some
+    box changed are checked again for hidden singles and naked twins.
+    Input: A sudoku in dictionary form, and optionally the boxes changed since it was
+    last propagated to a fixpoint; None starts from every box.
+    Output: The resulting sudoku in dictionary form, or False if a box runs out of values.
+    """
+    peers = topology.peers
+    index = topology.index
+    box_units = topology.box_units
+    unitlist = topology.unitlist
+
+    if changed is None:
+        queue = deque(box for box in topology.boxes if len(values[box]) == 1)
+        dirty = set(range(len(unitlist)))
+    else:
+        queue = deque(box for box in changed if len(values[box]) == 1)
+        dirty = set(u for box in changed for u in box_units[index[box]])
+
+    def remove(box, digits):
+        # Strike digits from a box, queueing it once solved and its units as changed
+        remaining = values[box]
+        for digit in digits:
+            remaining = remaining.replace(digit, '')
+        if remaining == values[box]:
+            return True
+        assign_value(values, box, remaining, recorder)
+        if len(remaining) == 1:
+            queue.append(box)
+        dirty.update(box_units[index[box]])
+        return len(remaining) > 0
+
+    def unit_candidates(unit):
+        return sum(len(values[box]) for box in unit)
+
+    while queue or dirty:
+        if stats is not None:
+            stats.rounds += 1
+            solved_before = solved_count(values)
+            before, start = candidate_count(values), perf_counter()
+
+        # Eliminate the value of every newly solved box from its peers
+        while queue:
+            box = queue.popleft()
+            for peer in peers[box]:
+                if not remove(peer, values[box]):
+                    return False
+        if stats is not None:
+            stats.add('eliminate', before - candidate_count(values), perf_counter() - start)
+
+        # Revisit only the units something changed in
+        changed, dirty = dirty, set()
+        for u in sorted(changed):
+            unit = unitlist[u]
+            if stats is not None:
+                before, start = unit_candidates(unit), perf_counter()
+            # Only choice
+            for digit in topology.digits:
+                dplaces = [box for box in unit if digit in values[box]]
+                if not dplaces:
+                    return False
+                if len(dplaces) == 1 and len(values[dplaces[0]]) > 1:
+                    if not remove(dplaces[0], values[dplaces[0]].replace(digit, '')):
+                        return False
+            if stats is not None:
+                after, now = unit_candidates(unit), perf_counter()
+                stats.add('only_choice', before - after, now - start)
+                before, start = after, now
+            # Naked twins
+            pairs = {}
+            for box in unit:
+                if len(values[box]) == 2:
+                    pairs.setdefault(values[box], []).append(box)
+            for twin_values, twins in pairs.items():
+                if len(twins) > 2:
+                    return False
+                if len(twins) == 2:
+                    for box in unit:
+                        if box not in twins and not remove(box, twin_values):
+                            return False
+            if stats is not None:
+                stats.add('naked_twins', before - unit_candidates(unit), perf_counter() - start)
+        if stats is not None and solved_count(values) == solved_before:
+            stats.stalls += 1
     return values
 
-def reduce_puzzle(values, peers, unitlist):
+# Strategies reduce_puzzle() can apply, by name. The basic ones run on every round;
+# the advanced ones are only tried, cheapest first, once a round solves no new box.
+# By default only naked triples and quads join the basic ones: the other advanced
+# strategies save a few search nodes on hard grids, but cost more time than they save.
+STRATEGIES = {
+    'eliminate': eliminate,
+    'only_choice': only_choice,
+    'naked_twins': naked_twins,
+    'pointing_pairs': pointing_pairs,
+    'box_line_reduction': box_line_reduction,
+    'hidden_pairs': hidden_pairs,
+    'naked_triples': naked_triples,
+    'hidden_triples': hidden_triples,
+    'naked_quads': naked_quads,
+}
+BASIC_STRATEGIES = ('eliminate', 'only_choice', 'naked_twins')
+ADVANCED_STRATEGIES = ('pointing_pairs', 'box_line_reduction', 'hidden_pairs',
+                       'naked_triples', 'hidden_triples', 'naked_quads')
+DEFAULT_STRATEGIES = BASIC_STRATEGIES + ('naked_triples', 'naked_quads')
+
+def select_strategies(strategies=None):
+    """
+    Split strategy names into the (basic, advanced) strategy functions reduce_puzzle() runs,
+    each in the order they are applied.
+    Args:
+        strategies(iterable): names from STRATEGIES; None selects DEFAULT_STRATEGIES. 'eliminate'
+            is required: it is what removes a solved digit from its peers, so without it
+            search() takes grids with clashing digits for solutions.
+    Raises:
+        ValueError: for unknown names, or a selection without 'eliminate'.
     """
-    Iterate eliminate() and only_choice(). If at some point, there is a box with no available values, return False.
+    if strategies is None:
+        strategies = DEFAULT_STRATEGIES
+    unknown = set(strategies) - set(STRATEGIES)
+    if unknown:
+        raise ValueError("Unknown strategies: {}".format(', '.join(sorted(unknown))))
+    if 'eliminate' not in strategies:
+        raise ValueError("The strategies must include eliminate")
+    basic = [STRATEGIES[name] for name in BASIC_STRATEGIES if name in strategies]
+    advanced = [STRATEGIES[name] for name in ADVANCED_STRATEGIES if name in strategies]
+    return basic, advanced
+
+def _apply_advanced(values, topology, recorder, stats, advanced):
+    """
+    Apply the advanced strategies in turn until one of them removes a candidate.
+    Returns the boxes that strategy changed, empty if none did.
+    """
+    before = dict(values)
+    for strategy in advanced:
+        _apply(strategy, values, topology, recorder, stats)
+        changed = [box for box in topology.boxes if values[box] != before[box]]
+        if changed:
+            return changed
+    return []
+
+def reduce_puzzle(values, topology=DIAGONAL, incremental=False, recorder=None, stats=None, strategies=None):
+    """
+    Iterate eliminate(), only_choice() and naked_twins(). If at some point, there is a box with no available values, return False.
+    When an iteration solves no new box, the selected advanced strategies (naked triples and
+    quads by default; pointing pairs, box/line reduction, hidden pairs and hidden triples
+    on request) are tried in turn, and the iterations resume as soon as one of them removes
+    a candidate.
     If the sudoku is solved, return the sudoku.
     If after an iteration of both functions, the sudoku remains the same, return the sudoku.
-    Input: A sudoku in dictionary form.
+    With incremental=True the basic strategies are driven by a work queue instead, see
+    propagate(); the advanced ones are tried whenever the queue runs dry. The queue always
+    runs all three basic strategies, so a selection leaving some of them out is rejected.
+    Every strategy applied is accounted for in stats, if given.
+    Input: A sudoku in dictionary form, and optionally the names of the strategies to use.
     Output: The resulting sudoku in dictionary form.
+    Raises ValueError for a selection select_strategies() rejects.
     """
-    #solved_values = [box for box in values.keys() if len(values[box]) == 1]
+    basic, advanced = select_strategies(strategies)
+
+    if incremental:
+        if len(basic) < len(BASIC_STRATEGIES):
+            raise ValueError("Incremental propagation runs all of {}".format(', '.join(BASIC_STRATEGIES)))
+        changed = None
+        while True:
+            values = propagate(values, topology, recorder, stats, changed)
+            if values is False:
+                return values
+            # Only the units of the boxes the advanced strategies changed need another look
+            changed = _apply_advanced(values, topology, recorder, stats, advanced)
+            if not changed:
+                return values
+            if any(len(values[box]) == 0 for box in changed):
+                return False
+
+    solved_values_before = solved_count(values)
     stalled = False
     while not stalled:
-        solved_values_before = len([box for box in values.keys() if len(values[box]) == 1])
-        values = eliminate(values, peers)
-        values = only_choice(values, unitlist)
-        # Reduce the puzzle with naked twins strategy
-        values = naked_twins(values)
-        #pp.pprint(temp)
-        solved_values_after = len([box for box in values.keys() if len(values[box]) == 1])
-        stalled = solved_values_before == solved_values_after
-        if len([box for box in values.keys() if len(values[box]) == 0]):
+        for strategy in basic:
+            values = _apply(strategy, values, topology, recorder, stats)
+        if any(len(values[box]) == 0 for box in values.keys()):
             return False
+        solved_values_after = solved_count(values)
+        stalled = solved_values_before == solved_values_after
+        if stats is not None:
+            stats.rounds += 1
+            if stalled:
+                stats.stalls += 1
+        if stalled:
+            # Only pay for the advanced strategies once the cheap ones stop solving boxes
+            stalled = not _apply_advanced(values, topology, recorder, stats, advanced)
+            if not stalled and any(len(values[box]) == 0 for box in values.keys()):
+                return False
+        solved_values_before = solved_values_after
     return values
 
-def search(values, boxes, peers, unitlist):
+def search(values, topology=DIAGONAL, incremental=False, recorder=None, stats=None, depth=0,
+           strategies=None, branching=MRV):
     "Using depth-first search and propagation, create a search tree and solve the sudoku."
+    if stats is not None:
+        stats.node(depth)
     # First, reduce the puzzle using the previous function
-    values = reduce_puzzle(values, peers, unitlist)
+    values = reduce_puzzle(values, topology, incremental, recorder, stats, strategies)
 
     # Where did this come from??
     if values is False:
         return False ## Failed earlier
-    # Check if all values found
-    if all(len(values[s]) == 1 for s in boxes):
-        return values ## Solved!
 
     # Choose one of the unfilled squares with the fewest possibilities
-    n,s = min((len(values[s]), s) for s in boxes if len(values[s]) > 1)
+    s = branching.select(values, topology)
+    if s is None:
+        return values ## Solved!
     # Now use recurrence to solve each one of the resulting sudokus, and
-    for value in values[s]:
+    for value in branching.order(values, s, topology):
+        if stats is not None:
+            stats.branches += 1
         new_sudoku = values.copy()
-        new_sudoku[s] = value
-        attempt = search(new_sudoku, boxes, peers, unitlist)
+        assign_value(new_sudoku, s, value, recorder)
+        attempt = search(new_sudoku, topology, incremental, recorder, stats, depth + 1, strategies, branching)
         if attempt:
             return attempt
+        if recorder is not None:
+            # The dead branch solved (or emptied) boxes in its copy only; put them back
+            recorder.backtrack(values, [(box, values[box]) for box in topology.boxes
+                                        if len(new_sudoku[box]) <= 1 and new_sudoku[box] != values[box]])
+    return False
+
+def search_trail(values, topology=DIAGONAL, incremental=False, recorder=None, stats=None, depth=0,
+                 strategies=None, branching=MRV):
+    """
+    Depth-first search like search(), but branches by assigning in place and undoing
+    the changes recorded on a trail when backtracking. Memory is bounded by the depth
+    of the search rather than by the number of nodes visited.
+    The grid is kept as a RankedTrailValues, so branching.select() finds the box with
+    the fewest candidates from its buckets rather than by scanning every box.
+    Input: A sudoku in dictionary form.
+    Output: The solved sudoku as a TrailValues dictionary, or False.
+    """
+    if not isinstance(values, TrailValues):
+        values = RankedTrailValues(values, topology)
+    if stats is not None:
+        stats.node(depth)
+
+    if reduce_puzzle(values, topology, incremental, recorder, stats, strategies) is False:
+        return False
+
+    # Choose one of the unfilled squares with the fewest possibilities
+    s = branching.select(values, topology)
+    if s is None:
+        return values ## Solved!
+    for value in branching.order(values, s, topology):
+        if stats is not None:
+            stats.branches += 1
+        mark = values.mark()
+        assign_value(values, s, value, recorder)
+        if search_trail(values, topology, incremental, recorder, stats, depth + 1, strategies, branching):
+            return values
+        values.undo(mark, recorder)
+    return False
+
+def search_count(values, topology=DIAGONAL, limit=2, incremental=False, strategies=None):
+    """
+    Count the solutions below a node of the search tree, propagating with reduce_puzzle()
+    at every node like search(). Stops as soon as `limit` solutions are found; None counts all.
+    Input: A sudoku in dictionary form.
+    Output: The number of solutions found, at most limit.
+    """
+    values = reduce_puzzle(values, topology, incremental, strategies=strategies)
+    if values is False:
+        return 0
+
+    unsolved = [(len(values[s]), s) for s in topology.boxes if len(values[s]) > 1]
+    if not unsolved:
+        return 1
+
+    # Choose one of the unfilled squares with the fewest possibilities
+    n, s = min(unsolved)
+    count = 0
+    for value in values[s]:
+        new_sudoku = values.copy()
+        new_sudoku[s] = value
+        count += search_count(new_sudoku, topology, None if limit is None else limit - count, incremental,
+                              strategies)
+        if limit is not None and count >= limit:
+            break
+    return count
+
+def count_solutions(grid, limit=2, diagonal=True, incremental=False, size=3, strategies=None):
+    """
+    Count the solutions of a Sudoku grid, stopping as soon as `limit` of them are found.
+    Args:
+        grid(string): a string representing a sudoku grid.
+        limit(int): the number of solutions to stop at, None to count them all.
+            With the default of 2, count_solutions(grid) == 1 checks that the puzzle is unique.
+        diagonal(bool): also constrain the two main diagonals.
+        incremental(bool): propagate with a work queue rather than repeated full sweeps.
+        size(int): the width of a square; 4 and 5 for 16x16 and 25x25 boards.
+        strategies(iterable): names of the STRATEGIES to propagate with, DEFAULT_STRATEGIES by default;
+            see select_strategies().
+    Returns:
+        The number of solutions found, at most limit.
+    """
+    topology = get_topology(diagonal, size)
+    return search_count(grid_values(grid, topology), topology, limit, incremental, strategies)
 
-def solve(grid):
+def solve(grid, engine='dict', diagonal=True, incremental=False, trail=False, recorder=None, size=3,
+          stats=None, strategies=None, branching=MRV):
     """
     Find the solution to a Sudoku grid.
     Args:
         grid(string): a string representing a sudoku grid.
             Example: '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
+        engine(string): 'dict' for the string-candidate solver below, 'bitmask' for the
+            array-backed solver in sudoku_bitmask.py, 'dlx' for the dancing links
+            exact-cover solver in sudoku_dlx.py.
+        diagonal(bool): also constrain the two main diagonals.
+        incremental(bool): propagate with a work queue rather than repeated full sweeps.
+        trail(bool): backtrack by undoing a trail of changes instead of copying the grid.
+        recorder(Recorder): records the assignments for visualize.py; dict engine only.
+        size(int): the width of a square; 4 and 5 for 16x16 and 25x25 boards, where the
+            'bitmask' and 'dlx' engines are much faster than 'dict'.
+        stats(sudoku_stats.Stats): collects per-strategy and search counters; dict and
+            bitmask engines only.
+        strategies(iterable): names of the STRATEGIES to propagate with, DEFAULT_STRATEGIES by default,
+            see select_strategies(); dict engine only.
+        branching(Branching): picks the box to branch on and the order of its values;
+            dict engine only.
     Returns:
         The dictionary representation of the final sudoku grid. False if no solution exists.
     """
-    # Set some global variables
-    rows = 'ABCDEFGHI'
-    cols = '123456789'
-
-    boxes = cross(rows, cols)
-
-    row_units = [cross(r, cols) for r in rows]
-    column_units = [cross(rows, c) for c in cols]
-    #print(cross(rows,cols))
-    square_units = [cross(rs, cs) for rs in ('ABC', 'DEF', 'GHI') for cs in ('123', '456', '789')]
-    #print(square_units)
-
-    # Define diaganal units for peers
-    diagonal_units_a = [[rows[i]+cols[i] for i in range(0, len(rows))]]
-    diagonal_units_b = [[rows[(len(rows)-1-i)]+cols[i] for i in range(0, len(rows))]]
-    #print(diagonal_units_a)
-    #print(diagonal_units_b)
-    unitlist = row_units + column_units + square_units + diagonal_units_a + diagonal_units_b
-    #print(unitlist)
-    units = dict((s, [u for u in unitlist if s in u]) for s in boxes)
-    #print(units)
-    #print("--")
-    peers = dict((s, set(sum(units[s], [])) - set([s])) for s in boxes)
-    #pp.pprint(peers)
+    # The units and peers are built once per variant and shared by every call
+    topology = get_topology(diagonal, size)
+
+    if engine != 'dict' and recorder is not None:
+        raise ValueError("Only the dict engine records assignments")
+    if engine != 'dict' and strategies is not None:
+        raise ValueError("Only the dict engine selects strategies")
+    if engine != 'dict' and branching is not MRV:
+        raise ValueError("Only the dict engine takes a branching heuristic")
+    if engine == 'bitmask':
+        return sudoku_bitmask.solve(grid, topology, incremental, stats)
+    if engine == 'dlx':
+        if stats is not None:
+            raise ValueError("The dlx engine does not collect stats")
+        return sudoku_dlx.solve(grid, topology)
+    if engine != 'dict':
+        raise ValueError("Unknown engine: {}".format(engine))
 
     # Convert Grid to Dictionary
-    puzzle = grid_values(grid, boxes)
-    #pp.pprint(puzzle)
+    puzzle = grid_values(grid, topology)
+    if recorder is not None:
+        recorder.start(puzzle)
 
     # Reduce the puzzle
-    puzzle = reduce_puzzle(puzzle, peers, unitlist)
-    #pp.pprint(puzzle)
+    puzzle = reduce_puzzle(puzzle, topology, incremental, recorder, stats, strategies)
+    if puzzle is False:
+        return False
 
     # Search
-    puzzle = search(puzzle, boxes, peers, unitlist)
+    if trail:
+        puzzle = search_trail(puzzle, topology, incremental, recorder, stats, strategies=strategies,
+                              branching=branching)
+        return puzzle and dict(puzzle)
+    puzzle = search(puzzle, topology, incremental, recorder, stats, strategies=strategies, branching=branching)
 
     # Return puzzle
     return puzzle
@@ -242,11 +787,12 @@ def solve(grid):
 
 if __name__ == '__main__':
     diag_sudoku_grid = '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3'
-    display(solve(diag_sudoku_grid))
+    recorder = Recorder('delta')
+    display(solve(diag_sudoku_grid, recorder=recorder))
 
     try:
         from visualize import visualize_assignments
-        visualize_assignments(assignments)
+        visualize_assignments(recorder)
 
     except SystemExit:
         pass
@@ -0,0 +1,396 @@
+import itertools
+import solution
+import solution_test
+import sudoku_batch_test
+import sudoku_bitmask
+import sudoku_dlx
+import unittest
+
+from sudoku_stats import Stats
+from sudoku_topology import STANDARD
+
+
+class TestIncrementalPropagation(unittest.TestCase):
+    grids = sudoku_batch_test.TestSolveMany.grids
+
+    def test_solve(self):
+        grid = solution_test.TestDiagonalSudoku.diagonal_grid
+        expected = solution_test.TestDiagonalSudoku.solved_diag_sudoku
+        self.assertEqual(solution.solve(grid, incremental=True), expected)
+        self.assertEqual(solution.solve(grid, engine='bitmask', incremental=True), expected)
+
+    def test_standard_grids(self):
+        for grid in self.grids:
+            expected = solution.solve(grid, diagonal=False)
+            self.assertEqual(solution.solve(grid, diagonal=False, incremental=True), expected)
+            self.assertEqual(solution.solve(grid, engine='bitmask', diagonal=False, incremental=True), expected)
+
+    def test_reaches_sweep_fixpoint(self):
+        # The queue runs to a full fixpoint, so it never leaves more candidates than the sweep
+        for grid in self.grids[:3]:
+            sweep = sudoku_bitmask.reduce_puzzle(sudoku_bitmask.grid_cells(grid), STANDARD)
+            cells = sudoku_bitmask.propagate(sudoku_bitmask.grid_cells(grid), STANDARD)
+            self.assertTrue(all(m & s == m for m, s in zip(cells, sweep)))
+            queued = solution.reduce_puzzle(solution.grid_values(grid, STANDARD), STANDARD, incremental=True,
+                                            strategies=solution.BASIC_STRATEGIES)
+            self.assertEqual(sudoku_bitmask.cells_values(cells, STANDARD), queued)
+
+    def test_changed_boxes(self):
+        # Restarting from the boxes the advanced strategies changed reaches the same fixpoint
+        basic, advanced = solution.select_strategies(solution.STRATEGIES)
+        for grid in self.grids:
+            values = solution.propagate(solution.grid_values(grid, STANDARD), STANDARD)
+            if values is False:
+                continue
+            changed = solution._apply_advanced(values, STANDARD, None, None, advanced)
+            if not changed or any(len(values[box]) == 0 for box in changed):
+                continue
+            self.assertEqual(solution.propagate(dict(values), STANDARD, changed=changed),
+                             solution.propagate(dict(values), STANDARD))
+            self.assertEqual(solution.solve(grid, diagonal=False, incremental=True, strategies=solution.STRATEGIES),
+                             solution.solve(grid, diagonal=False, strategies=solution.STRATEGIES))
+
+    def test_contradiction(self):
+        values = solution.grid_values('12' + '.' * 6 + '3' + '.' * 9 + '3' + '.' * 62, STANDARD)
+        values['A3'] = '3'
+        self.assertFalse(solution.propagate(values, STANDARD))
+
+
+class TestTrailSearch(unittest.TestCase):
+    grids = sudoku_batch_test.TestSolveMany.grids
+
+    def test_solve(self):
+        grid = solution_test.TestDiagonalSudoku.diagonal_grid
+        expected = solution_test.TestDiagonalSudoku.solved_diag_sudoku
+        self.assertEqual(solution.solve(grid, trail=True), expected)
+        self.assertEqual(solution.solve(grid, incremental=True, trail=True), expected)
+
+    def test_standard_grids(self):
+        for grid in self.grids:
+            self.assertEqual(solution.solve(grid, diagonal=False, trail=True), solution.solve(grid, diagonal=False))
+
+    def test_undo(self):
+        values = solution.TrailValues(solution.grid_values(self.grids[2], STANDARD))
+        before = dict(values)
+        mark = values.mark()
+        solution.reduce_puzzle(values, STANDARD)
+        values['A2'] = values['A2'][0]
+        self.assertNotEqual(values, before)
+        values.undo(mark)
+        self.assertEqual(values, before)
+        self.assertEqual(values.trail, [])
+
+    def test_trail_bounded_by_depth(self):
+        values = solution.search_trail(solution.grid_values(self.grids[2], STANDARD), STANDARD)
+        # At most every candidate of every box is struck once along the final path
+        self.assertLessEqual(len(values.trail), 81 * 9)
+
+
+class TestRecorder(unittest.TestCase):
+    grid = solution_test.TestDiagonalSudoku.diagonal_grid
+
+    def test_off_by_default(self):
+        self.assertFalse(hasattr(solution, 'assignments'))
+        recorder = solution.Recorder('off')
+        self.assertTrue(solution.solve(self.grid, recorder=recorder))
+        self.assertEqual(len(recorder.frames), 0)
+
+    def test_ring(self):
+        recorder = solution.Recorder('ring', maxlen=5)
+        solved = solution.solve(self.grid, recorder=recorder)
+        self.assertEqual(len(recorder.frames), 5)
+        self.assertEqual(recorder.frames[-1], solved)
+
+    def test_delta_replay(self):
+        recorder = solution.Recorder('delta')
+        solved = solution.solve(self.grid, recorder=recorder)
+        self.assertEqual(recorder.initial, solution.grid_values(self.grid))
+        # The deltas of the winning branch end on the solution
+        replay = dict(recorder.initial)
+        for box, value in recorder.frames:
+            replay[box] = value
+        self.assertEqual(replay, solved)
+
+    def test_delta_replay_backtracks(self):
+        grid = sudoku_batch_test.TestSolveMany.grids[2]
+
+        def solved_boxes(values):
+            return dict((box, value) for box, value in values.items() if len(value) == 1)
+
+        class Checked(solution.Recorder):
+            # Keeps the solved boxes of the grid searched at every frame
+            def __init__(self):
+                solution.Recorder.__init__(self, 'delta')
+                self.grids = []
+
+            def record(self, values, box, value):
+                solution.Recorder.record(self, values, box, value)
+                self.grids.append((len(self.frames), solved_boxes(values)))
+
+            def backtrack(self, values, restored):
+                solution.Recorder.backtrack(self, values, restored)
+                self.grids.append((len(self.frames), solved_boxes(values)))
+
+        for trail in (False, True):
+            stats, recorder = Stats(), Checked()
+            solved = solution.solve(grid, diagonal=False, trail=trail, recorder=recorder, stats=stats,
+                                    strategies=solution.BASIC_STRATEGIES)
+            self.assertGreater(stats.branches, 1)
+            # Dead branches are undone in the replay as they are in the search
+            replay = dict(recorder.initial)
+            frames = iter(recorder.frames)
+            done = 0
+            for count, expected in recorder.grids:
+                for box, value in itertools.islice(frames, count - done):
+                    replay[box] = value
+                done = count
+                self.assertEqual(solved_boxes(replay), expected)
+            self.assertEqual(replay, solved)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            solution.Recorder('ring')
+        with self.assertRaises(ValueError):
+            solution.solve(self.grid, engine='bitmask', recorder=solution.Recorder())
+
+    def test_visualize_consumes_deltas(self):
+        try:
+            import visualize
+        except ImportError:
+            self.skipTest("pygame is not installed")
+        played = []
+        play, visualize.play = visualize.play, played.extend
+        try:
+            recorder = solution.Recorder('delta')
+            solved = solution.solve(self.grid, recorder=recorder)
+            visualize.visualize_assignments(recorder)
+            with self.assertRaises(ValueError):
+                visualize.visualize_assignments(solution.Recorder('off'))
+        finally:
+            visualize.play = play
+        # One frame per newly solved box, ending on the solution
+        for before, after in zip([recorder.initial] + played, played):
+            self.assertEqual(len([box for box in after if after[box] != before[box]]), 1)
+        self.assertEqual(played[-1], solved)
+
+
+class TestNakedSubsets(unittest.TestCase):
+
+    def test_naked_triple(self):
+        values = dict((box, '123456789') for box in STANDARD.boxes)
+        values.update({'A1': '12', 'A2': '23', 'A3': '13', 'A4': '1234'})
+        solution.naked_triples(values, STANDARD)
+        self.assertEqual(values['A4'], '4')
+        self.assertEqual(values['A9'], '456789')
+        # Boxes outside the unit are left alone
+        self.assertEqual(values['B4'], '123456789')
+        # B1-C3 share the square unit with the triple
+        self.assertEqual(values['B1'], '456789')
+
+    def test_naked_quad_bitmask_matches_dict(self):
+        values = dict((box, '123456789') for box in STANDARD.boxes)
+        values.update({'D1': '12', 'D2': '234', 'D3': '34', 'D5': '14', 'D7': '1456'})
+        cells = sudoku_bitmask.naked_subsets(sudoku_bitmask.values_cells(values, STANDARD), STANDARD, 4)
+        self.assertEqual(sudoku_bitmask.cells_values(cells, STANDARD), solution.naked_quads(values, STANDARD))
+        self.assertEqual(values['D7'], '56')
+
+    def test_twins_bucketed_per_unit(self):
+        values = dict((box, '123456789') for box in STANDARD.boxes)
+        values.update({'A1': '45', 'A9': '45', 'I1': '45'})
+        solution.naked_twins(values, STANDARD)
+        self.assertEqual(values['A5'], '1236789')
+        self.assertEqual(values['E1'], '1236789')
+        # A9 and I1 share no unit
+        self.assertEqual(values['E9'], '123456789')
+
+
+
+class TestAdvancedStrategies(unittest.TestCase):
+    grids = sudoku_batch_test.TestSolveMany.grids
+
+    def empty(self):
+        return dict((box, '123456789') for box in STANDARD.boxes)
+
+    def test_hidden_pair(self):
+        values = self.empty()
+        for box in STANDARD.unitlist[0][2:]:
+            values[box] = '3456789'
+        solution.hidden_pairs(values, STANDARD)
+        self.assertEqual(values['A1'], '12')
+        self.assertEqual(values['A2'], '12')
+        self.assertEqual(values['B1'], '123456789')
+
+    def test_hidden_triple(self):
+        values = self.empty()
+        for box in STANDARD.unitlist[9][3:]:
+            values[box] = '456789'
+        values['A1'] = '12458'
+        solution.hidden_triples(values, STANDARD)
+        self.assertEqual(values['A1'], '12')
+        self.assertEqual(values['B1'], '123')
+
+    def test_placed_digits_settled(self):
+        grid = self.grids[0]
+        expected = solution.solve(grid, engine='dlx', diagonal=False)
+        for strategy in (solution.hidden_pairs, solution.hidden_triples, solution.pointing_pairs,
+                         solution.box_line_reduction):
+            # Fresh from the grid, the clues are still candidates of their peers
+            values = strategy(solution.grid_values(grid, STANDARD), STANDARD)
+            for box in STANDARD.boxes:
+                self.assertIn(expected[box], values[box])
+
+    def test_pointing_pair(self):
+        values = self.empty()
+        for box in ('A3', 'B1', 'B2', 'B3', 'C1', 'C2', 'C3'):
+            values[box] = '12346789'
+        solution.pointing_pairs(values, STANDARD)
+        self.assertEqual(values['A9'], '12346789')
+        self.assertEqual(values['A1'], '123456789')
+        # Box/line reduction does not apply: 5 still fits all over row A
+        values = self.empty()
+        for box in ('A3', 'B1', 'B2', 'B3', 'C1', 'C2', 'C3'):
+            values[box] = '12346789'
+        solution.box_line_reduction(values, STANDARD)
+        self.assertEqual(values['A9'], '123456789')
+
+    def test_box_line_reduction(self):
+        values = self.empty()
+        for box in STANDARD.unitlist[0][2:]:
+            values[box] = '12346789'
+        solution.box_line_reduction(values, STANDARD)
+        self.assertEqual(values['C3'], '12346789')
+        self.assertEqual(values['D1'], '123456789')
+
+    def test_pointing_along_diagonal(self):
+        topology = solution.DIAGONAL
+        values = dict((box, '123456789') for box in topology.boxes)
+        for box in ('A2', 'A3', 'B1', 'B3', 'C1', 'C2', 'C3'):
+            values[box] = '12346789'
+        solution.pointing_pairs(values, topology)
+        self.assertEqual(values['I9'], '12346789')
+        self.assertEqual(values['I1'], '123456789')
+
+    def test_select_strategies(self):
+        basic, advanced = solution.select_strategies(('naked_quads', 'eliminate', 'hidden_pairs'))
+        self.assertEqual(basic, [solution.eliminate])
+        self.assertEqual(advanced, [solution.hidden_pairs, solution.naked_quads])
+        basic, advanced = solution.select_strategies()
+        self.assertEqual(advanced, [solution.naked_triples, solution.naked_quads])
+        with self.assertRaises(ValueError):
+            solution.select_strategies(('x_wing',))
+        for strategies in ((), ('only_choice',), ('naked_twins',), ('hidden_pairs',)):
+            with self.assertRaises(ValueError):
+                solution.solve(self.grids[0], diagonal=False, strategies=strategies)
+            with self.assertRaises(ValueError):
+                solution.count_solutions(self.grids[0], diagonal=False, strategies=strategies)
+        partial = ('eliminate', 'only_choice', 'hidden_pairs')
+        self.assertEqual(solution.solve(self.grids[0], diagonal=False, strategies=partial),
+                         solution.solve(self.grids[0], engine='dlx', diagonal=False))
+        with self.assertRaises(ValueError):
+            solution.solve(self.grids[0], diagonal=False, incremental=True, strategies=partial)
+        with self.assertRaises(ValueError):
+            solution.solve(self.grids[0], engine='bitmask', strategies=solution.BASIC_STRATEGIES)
+
+    def test_fewer_branches(self):
+        grid = self.grids[2]
+        basic, full = Stats(), Stats()
+        expected = solution.solve(grid, diagonal=False, strategies=solution.BASIC_STRATEGIES, stats=basic)
+        for incremental in (False, True):
+            self.assertEqual(solution.solve(grid, diagonal=False, incremental=incremental, stats=full,
+                                            strategies=solution.STRATEGIES), expected)
+            self.assertEqual(solution.solve(grid, diagonal=False, incremental=incremental, trail=True,
+                                            strategies=solution.STRATEGIES), expected)
+        self.assertGreater(basic.branches, 0)
+        self.assertEqual(full.branches, 0)
+
+    def test_standard_grids(self):
+        for grid in self.grids:
+            self.assertEqual(solution.solve(grid, diagonal=False),
+                             solution.solve(grid, engine='dlx', diagonal=False))
+
+
+
+class TestBranching(unittest.TestCase):
+    grids = sudoku_batch_test.TestSolveMany.grids
+
+    def values(self):
+        values = dict((box, '123456789') for box in STANDARD.boxes)
+        values.update({'A1': '12', 'E5': '34', 'E6': '5', 'E7': '6', 'E8': '7', 'I1': '189'})
+        return values
+
+    def test_select(self):
+        values = self.values()
+        self.assertEqual(solution.MRV.select(values, STANDARD), 'A1')
+        # E5 ties with A1, but three of its peers are solved
+        self.assertEqual(solution.Branching(degree=True).select(values, STANDARD), 'A1')
+        for box in ('A2', 'A3', 'A4', 'A6'):
+            values[box] = '9'
+        self.assertEqual(solution.MRV.select(values, STANDARD), 'A1')
+        self.assertEqual(solution.Branching(degree=True).select(values, STANDARD), 'E5')
+        self.assertIsNone(solution.MRV.select(solution.solve(self.grids[0], diagonal=False), STANDARD))
+
+    def test_order(self):
+        values = self.values()
+        values['B2'] = '28'
+        self.assertEqual(solution.MRV.order(values, 'A1', STANDARD), '12')
+        # Every unsolved peer of I1 can hold a 1, A1 can't hold an 8 or a 9
+        self.assertEqual(solution.Branching(lcv=True).order(values, 'I1', STANDARD), ['8', '9', '1'])
+        self.assertEqual(solution.Branching(lcv=True).order(values, 'A1', STANDARD), ['1', '2'])
+
+    def test_ranked_buckets(self):
+        values = solution.RankedTrailValues(self.values(), STANDARD)
+        mark = values.mark()
+        solution.reduce_puzzle(values, STANDARD)
+        values['A1'] = values['A1'][0]
+        for n, bucket in enumerate(values.buckets):
+            self.assertEqual(bucket, set(box for box in values if len(values[box]) == n))
+        values.undo(mark)
+        self.assertEqual(values.buckets[2], set(['A1', 'E5']))
+        self.assertEqual(solution.MRV.select(values, STANDARD), 'A1')
+
+    def test_solve(self):
+        grid = solution_test.TestDiagonalSudoku.diagonal_grid
+        expected = solution_test.TestDiagonalSudoku.solved_diag_sudoku
+        for branching in (solution.Branching(degree=True), solution.Branching(lcv=True),
+                          solution.Branching(degree=True, lcv=True)):
+            self.assertEqual(solution.solve(grid, branching=branching), expected)
+            self.assertEqual(solution.solve(grid, branching=branching, trail=True), expected)
+        with self.assertRaises(ValueError):
+            solution.solve(grid, engine='bitmask', branching=solution.Branching(degree=True))
+
+    def test_degree_expands_fewer_nodes(self):
+        grid = solution_test.TestDiagonalSudoku.diagonal_grid
+        mrv, degree = Stats(), Stats()
+        solution.solve(grid, strategies=solution.BASIC_STRATEGIES, stats=mrv)
+        solution.solve(grid, strategies=solution.BASIC_STRATEGIES, stats=degree,
+                       branching=solution.Branching(degree=True))
+        self.assertLessEqual(degree.nodes, mrv.nodes)
+
+
+class TestCountSolutions(unittest.TestCase):
+    grids = sudoku_batch_test.TestSolveMany.grids
+
+    def test_unique(self):
+        self.assertEqual(solution.count_solutions(solution_test.TestDiagonalSudoku.diagonal_grid), 1)
+        for grid in self.grids[:3]:
+            self.assertEqual(solution.count_solutions(grid, diagonal=False), 1)
+            self.assertEqual(solution.count_solutions(grid, diagonal=False, incremental=True), 1)
+
+    def test_no_solution(self):
+        self.assertEqual(solution.count_solutions(self.grids[3], diagonal=False), 0)
+
+    def test_limit(self):
+        grid = self.grids[0][:20] + '.' * 61
+        self.assertEqual(solution.count_solutions(grid, diagonal=False), 2)
+        self.assertEqual(solution.count_solutions(grid, limit=7, diagonal=False), 7)
+
+    def test_count_all_matches_dlx(self):
+        # Blanking the top rows of a solved grid leaves a known number of completions
+        solved = solution.solve(self.grids[0], diagonal=False)
+        grid = ''.join(solved[box] for box in STANDARD.boxes)
+        grid = '.' * 27 + grid[27:]
+        self.assertEqual(solution.count_solutions(grid, limit=None, diagonal=False),
+                         sudoku_dlx.count_solutions(grid, STANDARD))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Solve many Sudoku grids at once across a pool of worker processes.
+
+Grids are streamed: solve_many() only pulls a bounded window of puzzles from
+its input ahead of the results it has yielded, so it can be fed a generator
+over a corpus of millions of lines without holding it in memory.
+
+Example:
+    for index, solved in solve_many(iter_grids('puzzles.txt'), workers=8):
+        ...
+    solve_file('puzzles.txt', 'solutions.txt', workers=8, use_mmap=True)
+"""
+import os
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool
+
+import sudoku_bitmask
+import sudoku_io
+from sudoku_topology import get_topology
+
+
+def iter_grids(path, use_mmap=False):
+    """
+    Yield the grids of a puzzle file, one per line.
+    Blank lines and lines starting with '#' are skipped.
+    """
+    for line in sudoku_io.iter_lines(path, use_mmap):
+        yield line.decode('ascii')
+
+
+def _solve_job(job, diagonal, size=3):
+    """
+    Solve one (index, grid) job and return (index, solved grid string or False),
+    or (index, None) if the grid can't be read.
+    """
+    index, grid = job
+    topology = get_topology(diagonal, size)
+    try:
+        cells = sudoku_io.decode(grid, topology)
+    except ValueError:
+        # One malformed line must not abort the rest of the stream
+        return index, None
+    cells = sudoku_bitmask.search(cells, topology)
+    if cells is False:
+        return index, False
+    return index, sudoku_io.encode(cells, topology).decode('ascii')
+
+
+def solve_many(grids, workers=None, chunksize=64, ordered=True, diagonal=True, size=3):
+    """
+    Solve every grid of an iterable with the bitmask engine.
+    Args:
+        grids(iterable): grids in string or bytes form, e.g. from iter_grids(),
+            sudoku_io.iter_lines() or a generator.
+        workers(int): number of worker processes, os.cpu_count() by default.
+            1 solves in the calling process.
+        chunksize(int): number of grids handed to a worker at a time.
+        ordered(bool): yield results in input order; otherwise as soon as they complete.
+        diagonal(bool): also constrain the two main diagonals, as `solution.solve` does.
+        size(int): the width of a square, 3 for the classic 9x9 board.
+    Yields:
+        (index, solution) pairs, where index is the position of the grid in the input
+        and solution is the solved grid in string form, False if it has none, or
+        None if the grid is malformed (wrong length or characters).
+    """
+    jobs = enumerate(grids)
+    solve_job = partial(_solve_job, diagonal=diagonal, size=size)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for job in jobs:
+            yield solve_job(job)
+        return
+
+    # Keep two windows in flight, so the workers are never idle while the
+    # results of the previous window are being consumed
+    window = chunksize * workers * 2
+    with Pool(workers) as pool:
+        mapper = pool.imap if ordered else pool.imap_unordered
+        pending = None
+        batch = list(islice(jobs, window))
+        if batch:
+            pending = mapper(solve_job, batch, chunksize)
+        while pending is not None:
+            batch = list(islice(jobs, window))
+            following = mapper(solve_job, batch, chunksize) if batch else None
+            for result in pending:
+                yield result
+            pending = following
+
+
+def solve_file(src, dst, workers=None, chunksize=64, diagonal=True, size=3, use_mmap=False):
+    """
+    Solve every grid of a puzzle file and write the solutions to another, one per
+    line in the same order. Grids without a solution, and malformed ones, are
+    written as a line of '.'.
+    Returns:
+        The number of grids read.
+    """
+    topology = get_topology(diagonal, size)
+    unsolved = '.' * len(topology.boxes)
+    lines = sudoku_io.iter_lines(src, use_mmap)
+    count = 0
+    with open(dst, 'w') as out:
+        for _, solved in solve_many(lines, workers, chunksize, True, diagonal, size):
+            out.write((solved or unsolved) + '\n')
+            count += 1
+    return count
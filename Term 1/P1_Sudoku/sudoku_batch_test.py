@@ -0,0 +1,49 @@
+import os
+import solution
+import sudoku_batch
+import tempfile
+import unittest
+
+
+class TestSolveMany(unittest.TestCase):
+    grids = ['..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..',
+             '2...8.3...6..7..84.3.5..2.9...1.54.8.........4.27.6...3.1..7.4.72..4..6...4.1...3',
+             '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......',
+             '11' + '.' * 79]
+
+    def expected(self):
+        results = []
+        for grid in self.grids:
+            values = solution.solve(grid, diagonal=False)
+            results.append(values and ''.join(values[box] for box in sorted(values)))
+        return results
+
+    def test_serial(self):
+        results = list(sudoku_batch.solve_many(self.grids, workers=1, diagonal=False))
+        self.assertEqual(results, list(enumerate(self.expected())))
+
+    def test_pool_ordered(self):
+        results = list(sudoku_batch.solve_many(iter(self.grids * 5), workers=2, chunksize=2, diagonal=False))
+        self.assertEqual(results, list(enumerate(self.expected() * 5)))
+
+    def test_pool_unordered(self):
+        results = sudoku_batch.solve_many(self.grids * 5, workers=2, chunksize=1, ordered=False, diagonal=False)
+        self.assertEqual(sorted(results), list(enumerate(self.expected() * 5)))
+
+    def test_malformed(self):
+        grids = [self.grids[0], self.grids[0][:-1], 'x' * 81, self.grids[1]]
+        expected = [(0, self.expected()[0]), (1, None), (2, None), (3, self.expected()[1])]
+        for workers in (1, 2):
+            self.assertEqual(list(sudoku_batch.solve_many(grids, workers=workers, chunksize=1, diagonal=False)),
+                             expected)
+
+    def test_iter_grids(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('# corpus\n' + '\n\n'.join(self.grids) + '\n')
+        try:
+            self.assertEqual(list(sudoku_batch.iter_grids(f.name)), self.grids)
+        finally:
+            os.remove(f.name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,275 @@
+"""
+Reproducible benchmark of the Sudoku solvers over puzzle sets of increasing difficulty.
+
+Every tier is solved with each engine, and puzzles/sec, p50/p99 latency, search
+nodes and peak traced memory are reported per tier, along with the cost of a
+naked_twins() pass. For the engines that collect a sudoku_stats.Stats, the
+candidates removed and time spent per strategy are reported too. Timing,
+stats collection and memory tracing are separate passes, so neither the
+instrumentation nor tracemalloc skews the latencies.
+
+Usage:
+    python sudoku_bench.py --engine dict --engine bitmask --output bench.json
+    python sudoku_bench.py --output new.json --compare bench.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import solution
+from sudoku_stats import Stats
+from sudoku_topology import get_topology
+
+# name -> (diagonal, grids)
+TIERS = {
+    'easy': (False, (
+        '..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..',
+        '2...8.3...6..7..84.3.5..2.9...1.54.8.........4.27.6...3.1..7.4.72..4..6...4.1...3',
+        '......9.7...42.18....7.5.261..9.4....5.....4....5.7..992.1.8....34.59...5.7......',
+        '.3..5..4...8.1.5..46.....12.7.5.2.8....6.3....4.1.9.3.25.....98..1.2.6...8..6..2.',
+        '.2.81.74.7....31...9...28.5..9.4..874..2.8..316..3.2..3.27...6...56....8.76.51.9.',
+    )),
+    'hard': (False, (
+        '85...24..72......9..4.........1.7..23.5...9...4...........8..7..17..........36.4.',
+        '..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97..',
+        '12..4......5.69.1...9...5.........7.7...52.9..3......2.9.6...5.4..9..8.1..3...9.4',
+        '...57..3.1......2.7...234......8...4..7..4...49....6.5.42...3.....7..9....18.....',
+        '7..1523........92....3.....1....47.8.......6............9...5.6.4.9.7...8....6.1.',
+        '1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..',
+        '1...34.8....8..5....4.6..21.18......3..1.2..6......81.52..7.9....6..9....9.64...2',
+        '...92......68.3...19..7...623..4.1....1...7....8.3..297...8..91...5.72......64...',
+        '.6.5.4.3.1...9...8.........9...5...6.4.6.2.7.7...4...5.........4...8...1.5.2.3.4.',
+        '7.....4...2..7..8...3..8.799..5..3...6..2..9...1.97..6...3..9...3..4..6...9..1.35',
+        '....7..2.8.......6.1.2.5...9.54....8.........3....85.1...3.2.8.4.......9.7..6....',
+        '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..',
+        '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......',
+    )),
+    'diagonal': (True, (
+        '2.............62....1....7...6..8...3...9...7...6..4...4....8....52.............3',
+        '1.........5...7..42..........72...41.8...........53..8....3......5.89....9.......',
+        '......63..9.......41....5.......6......1...2....254........8..3..4..1..5...5..98.',
+        '..6.4.8..9.....1.2........3......5..89.........2.7...........5.2..1..6.......42.8',
+        '8.3..7....62.5.......9......1.....8....4.......4....73.8..9.5.2.....4............',
+        '........6..1..783....5..4...2.....9...36.......9..2.1.7...............73........1',
+        '.5....27....1......4.............4....9...1.2.....1.8......3.1....7.4...872......',
+        '....4..5....91............6.9...5...35.18..........4.........1...27.1..4......8..',
+        '.5..7.......1....41..9..26........2.3.....1.9.9.5.....7..4...1...........8....6..',
+    )),
+    '17-clue': (False, (
+        '.......1.4.........2...........5.4.7..8...3....1.9....3..4..2...5.1........8.6...',
+        '.......1.4.........2...........5.6.4..8...3....1.9....3..4..2...5.1........8.7...',
+        '.......12....35......6...7.7.....3.....4..8..1...........12.....8.....4..5....6..',
+        '.......12..36..........7...41..2.......5..3..7.....6..28.....4....3..5...........',
+        '.......12..8.3...........4.12.5..........47...6.......5.7...3.....62.......1.....',
+        '.......12.4..5.........9....7.6..4.....1............5.....875..6.1...3..2........',
+        '.......12.5.4............3.7..6..4....1..........8....92....8.....51.7.......3...',
+        '.......13....3..8..7..........2.6....3....9......1....6..5..2.4...4..7..1........',
+        '.......13...2............8....76.2....8...4...1.......2.....75.6..34.........8...',
+        '.......13...5...7....8.2......4..9..1.7............2..89.....5..4....6......1....',
+        '.......13.2.5..............1.3....7....8.2.....4.........34.5..67....2......1....',
+        '.......13.4.....8.2...6....6.9...4.....8........3......3.1..5......4.7.6.........',
+    )),
+}
+
+ENGINES = ('dict', 'bitmask', 'dlx')
+
+# Engines that accept a Stats collector
+STATS_ENGINES = ('dict', 'bitmask')
+
+
+def percentile(samples, q):
+    """Return the q-th percentile (0-100) of samples, by nearest rank."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def is_solved(values, topology):
+    """Check that values is a complete solution of the topology."""
+    return bool(values) and all(sorted(values[box] for box in unit) == sorted(topology.digits)
+                                for unit in topology.unitlist)
+
+
+def bench_tier(name, engine='dict', repeat=3, incremental=False):
+    """
+    Benchmark one engine over one tier.
+    Args:
+        name(str): a key of TIERS.
+        engine(str): an engine accepted by `solution.solve`.
+        repeat(int): how many times each puzzle is timed.
+        incremental(bool): propagate with a work queue rather than repeated full sweeps.
+    Returns:
+        A dict of the tier's measurements; latencies are in milliseconds.
+    """
+    diagonal, grids = TIERS[name]
+    topology = get_topology(diagonal)
+
+    # Timing pass, after one warm-up solve of every grid
+    solved = 0
+    for grid in grids:
+        solved += is_solved(solution.solve(grid, engine=engine, diagonal=diagonal, incremental=incremental), topology)
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for grid in grids:
+            t = time.perf_counter()
+            solution.solve(grid, engine=engine, diagonal=diagonal, incremental=incremental)
+            latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+
+    # Instrumented pass
+    stats = None
+    if engine in STATS_ENGINES:
+        stats, nodes = Stats(), []
+        for grid in grids:
+            grid_stats = Stats()
+            solution.solve(grid, engine=engine, diagonal=diagonal, incremental=incremental, stats=grid_stats)
+            nodes.append(grid_stats.nodes)
+            stats.merge(grid_stats)
+
+    # Memory pass; the peak is the largest of any single solve
+    peak = 0
+    tracemalloc.start()
+    try:
+        for grid in grids:
+            tracemalloc.reset_peak()
+            solution.solve(grid, engine=engine, diagonal=diagonal, incremental=incremental)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        'puzzles': len(grids),
+        'solved': solved,
+        'puzzles_per_sec': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'peak_kib': peak / 1024.0,
+        'nodes': None,
+        'max_nodes': None,
+        'strategies': None,
+    }
+    if stats is not None:
+        result.update(stats.as_dict())
+        result['max_nodes'] = max(nodes)
+    return result
+
+
+def bench_naked_twins(name, repeat=20):
+    """
+    Time naked_twins() on every grid of a tier, once eliminate() and only_choice()
+    have narrowed it down to the point naked twins usually appear.
+    """
+    diagonal, grids = TIERS[name]
+    topology = get_topology(diagonal)
+    boards = []
+    for grid in grids:
+        values = solution.grid_values(grid, topology)
+        solution.only_choice(solution.eliminate(values, topology), topology)
+        boards.append(values)
+
+    latencies = []
+    for _ in range(repeat):
+        for values in boards:
+            values = values.copy()
+            t = time.perf_counter()
+            solution.naked_twins(values, topology)
+            latencies.append(time.perf_counter() - t)
+    return {
+        'calls_per_sec': len(latencies) / sum(latencies),
+        'p50_us': percentile(latencies, 50) * 1e6,
+        'p99_us': percentile(latencies, 99) * 1e6,
+    }
+
+
+def run(engines=ENGINES, tiers=None, repeat=3, incremental=False):
+    """Benchmark every engine over every tier, and return the report as a JSON-ready dict."""
+    tiers = list(tiers or TIERS)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'repeat': repeat,
+        'incremental': incremental,
+        'solve': {},
+        'naked_twins': {},
+    }
+    for engine in engines:
+        report['solve'][engine] = dict((name, bench_tier(name, engine, repeat, incremental)) for name in tiers)
+    for name in tiers:
+        report['naked_twins'][name] = bench_naked_twins(name)
+    return report
+
+
+def compare(baseline, report, threshold=0.1):
+    """
+    List the regressions of report against a baseline report.
+    A tier regresses when its puzzles/sec drops, or its p99 latency grows, by more
+    than threshold (a fraction).
+    Returns:
+        A list of human-readable lines, empty if nothing regressed.
+    """
+    regressions = []
+    for engine, tiers in report['solve'].items():
+        for name, result in tiers.items():
+            before = baseline.get('solve', {}).get(engine, {}).get(name)
+            if before is None:
+                continue
+            if result['puzzles_per_sec'] < before['puzzles_per_sec'] * (1 - threshold):
+                regressions.append('{} {}: {:.1f} -> {:.1f} puzzles/sec'.format(
+                    engine, name, before['puzzles_per_sec'], result['puzzles_per_sec']))
+            if result['p99_ms'] > before['p99_ms'] * (1 + threshold):
+                regressions.append('{} {}: p99 {:.2f} -> {:.2f} ms'.format(
+                    engine, name, before['p99_ms'], result['p99_ms']))
+    return regressions
+
+
+def print_report(report):
+    print('{:8} {:9} {:>10} {:>9} {:>9} {:>9} {:>9}'.format(
+        'engine', 'tier', 'puzzles/s', 'p50 ms', 'p99 ms', 'nodes', 'peak KiB'))
+    for engine, tiers in report['solve'].items():
+        for name, r in tiers.items():
+            print('{:8} {:9} {:10.1f} {:9.2f} {:9.2f} {:>9} {:9.1f}'.format(
+                engine, name, r['puzzles_per_sec'], r['p50_ms'], r['p99_ms'],
+                '-' if r['nodes'] is None else r['nodes'], r['peak_kib']))
+    for engine, tiers in report['solve'].items():
+        for name, r in tiers.items():
+            for strategy, counters in sorted((r['strategies'] or {}).items()):
+                print('{:8} {:9} {:13} {:8} removed {:8.2f} ms {:6} calls'.format(
+                    engine, name, strategy, counters['removed'], counters['time'] * 1000, counters['calls']))
+    for name, r in report['naked_twins'].items():
+        print('naked_twins {:9} {:10.0f} calls/s  p50 {:.1f} us  p99 {:.1f} us'.format(
+            name, r['calls_per_sec'], r['p50_us'], r['p99_us']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--engine', action='append', choices=ENGINES,
+                        help='engine to benchmark, may be repeated (default: all)')
+    parser.add_argument('--tier', action='append', choices=list(TIERS),
+                        help='tier to benchmark, may be repeated (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed solves per puzzle')
+    parser.add_argument('--incremental', action='store_true', help='propagate with a work queue')
+    parser.add_argument('--output', help='write the report to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON report to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.1, help='regression threshold, as a fraction')
+    args = parser.parse_args(argv)
+
+    report = run(args.engine or ENGINES, args.tier, args.repeat, args.incremental)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for line in regressions:
+            print('REGRESSION ' + line)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
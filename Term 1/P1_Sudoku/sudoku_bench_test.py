@@ -0,0 +1,45 @@
+import json
+import os
+import sudoku_bench
+import tempfile
+import unittest
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(sudoku_bench.percentile(samples, 50), 50)
+        self.assertEqual(sudoku_bench.percentile(samples, 99), 99)
+        self.assertEqual(sudoku_bench.percentile([3], 99), 3)
+
+    def test_bench_tier(self):
+        result = sudoku_bench.bench_tier('easy', 'bitmask', repeat=1)
+        self.assertEqual(result['solved'], result['puzzles'])
+        self.assertGreaterEqual(result['nodes'], result['puzzles'])
+        self.assertGreater(result['peak_kib'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertGreater(result['strategies']['eliminate']['removed'], 0)
+        self.assertIsNone(sudoku_bench.bench_tier('easy', 'dlx', repeat=1)['nodes'])
+
+    def test_main(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            path = f.name
+        try:
+            sudoku_bench.main(['--engine', 'bitmask', '--tier', 'easy', '--repeat', '1', '--output', path])
+            with open(path) as f:
+                report = json.load(f)
+        finally:
+            os.remove(path)
+        self.assertEqual(list(report['solve']), ['bitmask'])
+        self.assertEqual(list(report['naked_twins']), ['easy'])
+
+    def test_compare(self):
+        report = {'solve': {'dict': {'easy': {'puzzles_per_sec': 100.0, 'p99_ms': 5.0}}}}
+        self.assertEqual(sudoku_bench.compare(report, report), [])
+        slower = {'solve': {'dict': {'easy': {'puzzles_per_sec': 50.0, 'p99_ms': 10.0}}}}
+        self.assertEqual(len(sudoku_bench.compare(report, slower)), 2)
+        self.assertEqual(sudoku_bench.compare({}, slower), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,396 @@
+"""
+Bitmask-backed Sudoku engine.
+
+Every box is stored as an int in a flat list (bit ``i`` is set while the i-th
+digit of the board is still a candidate), in the same row-major order as
+`Topology.boxes`. Units and peers come from the index tables of the shared
+Topology, so the strategies below never build strings or touch box names, and
+the same functions solve 9x9, 16x16 and 25x25 boards. The dict form used by
+`solution.py` is only produced at the edges.
+"""
+from itertools import combinations
+from time import perf_counter
+
+from sudoku_topology import DIAGONAL
+
+
+class _Computed(object):
+    """Indexable stand-in for a lookup table too large to build."""
+    __slots__ = ('function',)
+
+    def __init__(self, function):
+        self.function = function
+
+    def __getitem__(self, mask):
+        return self.function(mask)
+
+
+def _popcount(mask):
+    return bin(mask).count('1')
+
+
+class Masks(object):
+    """Candidate-mask lookups for the digits of one board size.
+
+    Attributes
+    ----------
+    all : int
+        The mask of an empty box, with every digit still possible.
+
+    bit : dict<str, int>
+        The mask of each digit.
+
+    popcount, names : indexable by mask
+        The number of candidates in a mask, and its candidates as a string.
+        Plain lists up to 9 digits (16 for popcount), computed on the fly above.
+    """
+
+    def __init__(self, digits):
+        self.digits = digits
+        self.all = (1 << len(digits)) - 1
+        self.bit = dict((d, 1 << i) for i, d in enumerate(digits))
+        if len(digits) <= 16:
+            self.popcount = [_popcount(m) for m in range(self.all + 1)]
+        else:
+            self.popcount = _Computed(getattr(int, 'bit_count', _popcount))
+        if len(digits) <= 9:
+            self.names = [self.mask_digits(m) for m in range(self.all + 1)]
+        else:
+            self.names = _Computed(self.mask_digits)
+
+    def mask_digits(self, mask):
+        return ''.join(d for i, d in enumerate(self.digits) if mask >> i & 1)
+
+
+_masks = {}
+
+
+def masks(topology=DIAGONAL):
+    """Return the shared Masks for the digits of a topology."""
+    if topology.digits not in _masks:
+        _masks[topology.digits] = Masks(topology.digits)
+    return _masks[topology.digits]
+
+
+# Lookup tables of the classic 9-digit board
+DIGITS = '123456789'
+_NINE = masks(DIAGONAL)
+ALL_DIGITS = _NINE.all
+BIT = _NINE.bit
+POPCOUNT = _NINE.popcount
+MASK_DIGITS = _NINE.names
+
+
+def grid_cells(grid, topology=DIAGONAL):
+    """
+    Convert grid into a list of candidate masks, one per box.
+    Args:
+        grid(string) - A grid in string form, '.' for empties.
+    Returns:
+        A list of ints, the full mask for the empty boxes.
+    """
+    m = masks(topology)
+    bit = m.bit
+    cells = [bit[c] if c in bit else m.all for c in grid if c in bit or c == '.']
+    assert len(cells) == len(topology.boxes)
+    return cells
+
+
+def cells_values(cells, topology=DIAGONAL):
+    """Convert a list of candidate masks into the {'A1': '123456789', ...} dict form."""
+    names = masks(topology).names
+    return dict(zip(topology.boxes, [names[m] for m in cells]))
+
+
+def cells_grid(cells, topology=DIAGONAL):
+    """Convert a list of candidate masks back into the one-line grid form, '.' for unsolved boxes."""
+    m = masks(topology)
+    names, popcount = m.names, m.popcount
+    return ''.join([names[c] if popcount[c] == 1 else '.' for c in cells])
+
+
+def values_cells(values, topology=DIAGONAL):
+    """Convert the {'A1': '123456789', ...} dict form into a list of candidate masks."""
+    bit = masks(topology).bit
+    cells = []
+    for box in topology.boxes:
+        mask = 0
+        for d in values[box]:
+            mask |= bit[d]
+        cells.append(mask)
+    return cells
+
+
+def candidate_count(cells, topology=DIAGONAL):
+    "Count the candidates left in every box of cells."
+    popcount = masks(topology).popcount
+    return sum([popcount[m] for m in cells])
+
+
+def solved_count(cells, topology=DIAGONAL):
+    "Count the boxes of cells with a single candidate."
+    popcount = masks(topology).popcount
+    return sum(1 for m in cells if popcount[m] == 1)
+
+
+def _apply(strategy, cells, topology, stats):
+    "Apply a strategy, accounting for it in stats if given."
+    if stats is None:
+        return strategy(cells, topology)
+    return stats.measure(strategy, lambda cells: candidate_count(cells, topology), cells, topology)
+
+
+def eliminate(cells, topology=DIAGONAL):
+    """
+    Remove the value of every solved box from the candidates of its peers.
+    Input: A list of candidate masks.
+    Output: The same list, reduced in place.
+    """
+    peers = topology.peer_indices
+    popcount = masks(topology).popcount
+    for i, mask in enumerate(cells):
+        if popcount[mask] == 1:
+            clear = ~mask
+            for p in peers[i]:
+                cells[p] &= clear
+    return cells
+
+
+def only_choice(cells, topology=DIAGONAL):
+    """
+    Assign every digit that only fits in one box of a unit to that box.
+    Input: A list of candidate masks.
+    Output: The same list, reduced in place.
+    """
+    for unit in topology.unit_indices:
+        once = twice = 0
+        for i in unit:
+            mask = cells[i]
+            twice |= once & mask
+            once |= mask
+        singles = once & ~twice
+        while singles:
+            bit = singles & -singles
+            singles ^= bit
+            for i in unit:
+                if cells[i] & bit:
+                    cells[i] = bit
+                    break
+    return cells
+
+
+def naked_subsets(cells, topology=DIAGONAL, size=2):
+    """
+    Whenever `size` boxes of a unit share exactly `size` candidates between them,
+    remove those candidates from the rest of the unit.
+    Input: A list of candidate masks.
+    Output: The same list, reduced in place.
+    """
+    if size == 2:
+        return naked_twins(cells, topology)
+    popcount = masks(topology).popcount
+    for unit in topology.unit_indices:
+        candidates = [i for i in unit if 1 < popcount[cells[i]] <= size]
+        for subset in combinations(candidates, size):
+            mask = 0
+            for i in subset:
+                mask |= cells[i]
+            if popcount[mask] == size:
+                clear = ~mask
+                for j in unit:
+                    if j not in subset:
+                        cells[j] &= clear
+    return cells
+
+
+def naked_twins(cells, topology=DIAGONAL):
+    """
+    Remove the digits of every naked twin from the other boxes of its unit.
+    Input: A list of candidate masks.
+    Output: The same list, reduced in place.
+    """
+    popcount = masks(topology).popcount
+    for unit in topology.unit_indices:
+        seen = set()
+        for i in unit:
+            mask = cells[i]
+            if popcount[mask] != 2:
+                continue
+            if mask not in seen:
+                seen.add(mask)
+                continue
+            clear = ~mask
+            for j in unit:
+                if cells[j] != mask:
+                    cells[j] &= clear
+    return cells
+
+
+def propagate(cells, topology=DIAGONAL, stats=None):
+    """
+    Apply eliminate(), only_choice() and naked_twins() incrementally, driven by a work queue.
+    When a box is solved only its peers are updated, and only the units in which some
+    box changed are checked again for hidden singles and naked twins.
+    Returns False as soon as a box runs out of candidates.
+    """
+    peers = topology.peer_indices
+    units = topology.unit_indices
+    box_units = topology.box_units
+    popcount = masks(topology).popcount
+    full = masks(topology).all
+
+    def unit_candidates(unit):
+        return sum([popcount[cells[i]] for i in unit])
+
+    queue = [i for i, m in enumerate(cells) if popcount[m] == 1]
+    dirty = set(range(len(units)))
+    while queue or dirty:
+        if stats is not None:
+            stats.rounds += 1
+            solved_before = solved_count(cells, topology)
+            before, start = candidate_count(cells, topology), perf_counter()
+
+        # Eliminate the value of every newly solved box from its peers
+        while queue:
+            i = queue.pop()
+            mask = cells[i]
+            for p in peers[i]:
+                if cells[p] & mask:
+                    remaining = cells[p] & ~mask
+                    if not remaining:
+                        return False
+                    cells[p] = remaining
+                    if popcount[remaining] == 1:
+                        queue.append(p)
+                    dirty.update(box_units[p])
+        if stats is not None:
+            stats.add('eliminate', before - candidate_count(cells, topology), perf_counter() - start)
+
+        # Revisit only the units something changed in
+        changed, dirty = dirty, set()
+        for u in sorted(changed):
+            unit = units[u]
+            if stats is not None:
+                before, start = unit_candidates(unit), perf_counter()
+            once = twice = 0
+            pairs = set()
+            twins = []
+            for i in unit:
+                mask = cells[i]
+                twice |= once & mask
+                once |= mask
+                if popcount[mask] == 2:
+                    if mask in pairs:
+                        twins.append(mask)
+                    pairs.add(mask)
+            if once != full:
+                return False
+
+            # Only choice
+            singles = once & ~twice
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for i in unit:
+                    if cells[i] & bit:
+                        if cells[i] != bit:
+                            cells[i] = bit
+                            queue.append(i)
+                            dirty.update(box_units[i])
+                        break
+            if stats is not None:
+                after, now = unit_candidates(unit), perf_counter()
+                stats.add('only_choice', before - after, now - start)
+                before, start = after, now
+
+            # Naked twins
+            for mask in twins:
+                clear = ~mask
+                for i in unit:
+                    if cells[i] & mask and cells[i] != mask:
+                        remaining = cells[i] & clear
+                        if not remaining:
+                            return False
+                        cells[i] = remaining
+                        if popcount[remaining] == 1:
+                            queue.append(i)
+                        dirty.update(box_units[i])
+            if stats is not None:
+                stats.add('naked_twins', before - unit_candidates(unit), perf_counter() - start)
+        if stats is not None and solved_count(cells, topology) == solved_before:
+            stats.stalls += 1
+    return cells
+
+
+def reduce_puzzle(cells, topology=DIAGONAL, incremental=False, stats=None):
+    """
+    Iterate eliminate(), only_choice() and naked_twins() until no new box is solved.
+    With incremental=True the strategies are driven by a work queue instead, see propagate().
+    Every strategy applied is accounted for in stats, if given.
+    Returns False as soon as a box runs out of candidates.
+    """
+    if incremental:
+        return propagate(cells, topology, stats)
+
+    solved_before = solved_count(cells, topology)
+    while True:
+        _apply(eliminate, cells, topology, stats)
+        _apply(only_choice, cells, topology, stats)
+        _apply(naked_twins, cells, topology, stats)
+        if 0 in cells:
+            return False
+        solved_after = solved_count(cells, topology)
+        if stats is not None:
+            stats.rounds += 1
+        if solved_after == solved_before:
+            if stats is not None:
+                stats.stalls += 1
+            return cells
+        solved_before = solved_after
+
+
+def search(cells, topology=DIAGONAL, incremental=False, stats=None, depth=0):
+    "Using depth-first search and propagation, solve the puzzle held in cells."
+    if stats is not None:
+        stats.node(depth)
+    cells = reduce_puzzle(cells, topology, incremental, stats)
+    if cells is False:
+        return False
+
+    popcount = masks(topology).popcount
+    unsolved = [(popcount[m], i) for i, m in enumerate(cells) if popcount[m] > 1]
+    if not unsolved:
+        return cells ## Solved!
+
+    # Choose one of the unfilled boxes with the fewest possibilities
+    n, s = min(unsolved)
+
+    candidates = cells[s]
+    while candidates:
+        bit = candidates & -candidates
+        candidates ^= bit
+        if stats is not None:
+            stats.branches += 1
+        new_cells = cells[:]
+        new_cells[s] = bit
+        attempt = search(new_cells, topology, incremental, stats, depth + 1)
+        if attempt:
+            return attempt
+    return False
+
+
+def solve(grid, topology=DIAGONAL, incremental=False, stats=None):
+    """
+    Find the solution to a Sudoku grid with the bitmask engine.
+    Args:
+        grid(string): a string representing a sudoku grid.
+        topology(Topology): the board variant, diagonal by default as in `solution.solve`.
+        incremental(bool): propagate with a work queue rather than repeated full sweeps.
+        stats(sudoku_stats.Stats): collects per-strategy and search counters.
+    Returns:
+        The dictionary representation of the final sudoku grid. False if no solution exists.
+    """
+    cells = search(grid_cells(grid, topology), topology, incremental, stats)
+    if cells is False:
+        return False
+    return cells_values(cells, topology)
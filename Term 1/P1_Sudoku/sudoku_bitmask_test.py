@@ -0,0 +1,80 @@
+import random
+import solution
+import sudoku_bitmask
+import unittest
+
+import solution_test
+from sudoku_topology import get_topology
+
+
+class TestBitmaskConversions(unittest.TestCase):
+
+    def test_round_trip(self):
+        values = solution_test.TestNakedTwins.before_naked_twins_1
+        self.assertEqual(sudoku_bitmask.cells_values(sudoku_bitmask.values_cells(values)), values)
+
+    def test_grid_cells(self):
+        cells = sudoku_bitmask.grid_cells(solution_test.TestDiagonalSudoku.diagonal_grid)
+        self.assertEqual(len(cells), 81)
+        self.assertEqual(cells[0], sudoku_bitmask.BIT['2'])
+        self.assertEqual(cells[1], sudoku_bitmask.ALL_DIGITS)
+
+
+class TestBitmaskStrategies(unittest.TestCase):
+
+    def test_naked_twins(self):
+        for before, possible in ((solution_test.TestNakedTwins.before_naked_twins_1, solution_test.TestNakedTwins.possible_solutions_1),
+                                 (solution_test.TestNakedTwins.before_naked_twins_2, solution_test.TestNakedTwins.possible_solutions_2)):
+            cells = sudoku_bitmask.naked_twins(sudoku_bitmask.values_cells(before))
+            self.assertIn(sudoku_bitmask.cells_values(cells), possible)
+
+
+class TestBitmaskSolve(unittest.TestCase):
+
+    def test_solve(self):
+        self.assertEqual(sudoku_bitmask.solve(solution_test.TestDiagonalSudoku.diagonal_grid),
+                         solution_test.TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_solve_engine(self):
+        self.assertEqual(solution.solve(solution_test.TestDiagonalSudoku.diagonal_grid, engine='bitmask'),
+                         solution.solve(solution_test.TestDiagonalSudoku.diagonal_grid))
+
+    def test_unsolvable(self):
+        self.assertFalse(sudoku_bitmask.solve('22' + '.' * 79))
+
+
+class TestLargeBoards(unittest.TestCase):
+
+    def puzzle(self, size, blanks):
+        """A standard board of the given square width, filled by pattern and then blanked at random."""
+        topology = get_topology(False, size)
+        side = topology.side
+        cells = [topology.digits[(size * (r % size) + r // size + c) % side] for r in range(side) for c in range(side)]
+        rng = random.Random(size)
+        for i in rng.sample(range(len(cells)), int(blanks * len(cells))):
+            cells[i] = '.'
+        return topology, ''.join(cells)
+
+    def check(self, topology, grid, values):
+        for unit in topology.unitlist:
+            self.assertEqual(sorted(values[box] for box in unit), sorted(topology.digits))
+        for box, c in zip(topology.boxes, grid):
+            if c != '.':
+                self.assertEqual(values[box], c)
+
+    def test_solve(self):
+        for size, blanks in ((2, 0.6), (4, 0.5), (5, 0.4)):
+            topology, grid = self.puzzle(size, blanks)
+            for engine in ('bitmask', 'dlx'):
+                self.check(topology, grid, solution.solve(grid, engine=engine, diagonal=False, size=size))
+
+    def test_round_trip(self):
+        topology, grid = self.puzzle(4, 0.5)
+        cells = sudoku_bitmask.grid_cells(grid, topology)
+        self.assertEqual(sudoku_bitmask.cells_grid(cells, topology), grid)
+        values = sudoku_bitmask.cells_values(cells, topology)
+        self.assertEqual(sudoku_bitmask.values_cells(values, topology), cells)
+        self.assertEqual(values, solution.grid_values(grid, topology))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+"""
+A cache of solved puzzles in front of `solution.solve()`, keyed by canonical grid form.
+
+Puzzles that only differ by a symmetry of the board share a solution up to the
+same symmetry, so each grid is first brought to a canonical form: its boxes are
+permuted into a normal order and its digits relabelled in order of first
+appearance. The solution of the canonical grid is cached, and mapped back
+through the inverse permutation and relabelling on every hit.
+
+The symmetries used depend on the board:
+- standard boards: band and stack permutations, row and column permutations
+  within them, and transposition. Lines are ordered by clue-count signatures,
+  so variants whose lines tie on every signature may still get different keys;
+  that only costs a miss, never a wrong answer.
+- diagonal boards: the 8 rotations and reflections of the square, which are
+  the ones that keep both diagonals. The canonical form is exact.
+
+Example:
+    with SolveCache(maxsize=10000, path='solved.db') as cache:
+        values = cache.solve(grid, diagonal=False)
+"""
+import shelve
+from collections import OrderedDict
+
+import solution
+from sudoku_topology import get_topology
+
+
+def _transpose(side):
+    return [(i % side) * side + i // side for i in range(side * side)]
+
+
+def _dihedral(side):
+    """Return the 8 box permutations of the rotations and reflections of the square."""
+    rotate = [(side - 1 - i % side) * side + i // side for i in range(side * side)]
+    mirror = [i // side * side + side - 1 - i % side for i in range(side * side)]
+    perms = [list(range(side * side))]
+    for _ in range(3):
+        perms.append([perms[-1][j] for j in rotate])
+    perms += [[perm[j] for j in mirror] for perm in perms]
+    return perms
+
+
+def _line_order(grid, side, size):
+    """
+    Order the rows of a grid canonically: bands by signature, then rows within each band.
+    The signature of a row is its clue count and, for each of its clues, the clue count
+    of its column and how often its digit is given; no row or column permutation or
+    relabelling changes it.
+    """
+    rows = [grid[r * side:(r + 1) * side] for r in range(side)]
+    col_counts = [sum(1 for r in range(side) if rows[r][c] != '.') for c in range(side)]
+    digit_counts = dict((d, grid.count(d)) for d in set(grid))
+    keys = [(sum(1 for ch in row if ch != '.'),
+             sorted((col_counts[c], digit_counts[row[c]]) for c in range(side) if row[c] != '.'))
+            for row in rows]
+    bands = []
+    for b in range(0, side, size):
+        lines = sorted(range(b, b + size), key=lambda r: keys[r], reverse=True)
+        bands.append(lines)
+    bands.sort(key=lambda lines: [keys[r] for r in lines], reverse=True)
+    return [r for lines in bands for r in lines]
+
+
+def _normal_order(grid, topology):
+    """Return the permutation bringing the rows and then the columns of grid into their canonical order."""
+    side, size = topology.side, topology.size
+    rows = _line_order(grid, side, size)
+    by_rows = ''.join(grid[r * side:(r + 1) * side] for r in rows)
+    transpose = _transpose(side)
+    cols = _line_order(''.join(by_rows[j] for j in transpose), side, size)
+    return [rows[r] * side + c for r in range(side) for c in cols]
+
+
+def _relabel(grid, topology):
+    """Relabel the digits of grid in order of first appearance. Returns (grid, labels canonical -> original)."""
+    labels = {}
+    for ch in grid:
+        if ch != '.' and ch not in labels:
+            labels[ch] = topology.digits[len(labels)]
+    return ''.join(labels.get(ch, '.') for ch in grid), dict((v, k) for k, v in labels.items())
+
+
+def canonical_form(grid, topology):
+    """
+    Bring a grid into canonical form.
+    Args:
+        grid(string): a grid in string form, '.' or '0' for empties.
+    Returns:
+        (key, perm, labels): the canonical grid, the box permutation with
+        key[i] == relabelled grid[perm[i]], and the map from canonical digits back
+        to the digits of grid.
+    """
+    cells = ''.join(ch if ch in topology.digits else '.' for ch in grid if ch in topology.digits or ch in '.0')
+    assert len(cells) == len(topology.boxes)
+
+    if topology.diagonal:
+        candidates = _dihedral(topology.side)
+    else:
+        transpose = _transpose(topology.side)
+        candidates = []
+        for base in (list(range(len(cells))), transpose):
+            oriented = ''.join(cells[j] for j in base)
+            candidates.append([base[j] for j in _normal_order(oriented, topology)])
+
+    best = None
+    for perm in candidates:
+        key, labels = _relabel(''.join(cells[j] for j in perm), topology)
+        if best is None or key < best[0]:
+            best = (key, perm, labels)
+    return best
+
+
+class SolveCache(object):
+    """
+    An LRU cache of solutions by canonical grid, optionally backed by a shelve file.
+
+    Args:
+        maxsize(int): solutions kept in memory, least recently used evicted first.
+        path(str): a shelve file to read and write solutions through, so they
+            persist across processes; None keeps the cache in memory only.
+    """
+
+    def __init__(self, maxsize=1024, path=None):
+        self.maxsize = maxsize
+        self.memory = OrderedDict()
+        self.disk = shelve.open(path) if path is not None else None
+        self.hits = 0
+        self.misses = 0
+
+    def solve(self, grid, diagonal=True, size=3, **kwargs):
+        """
+        Find the solution to a Sudoku grid, solving it only if no variant of it is cached.
+        Other keyword arguments are handed to `solution.solve` on a miss.
+        Returns:
+            The dictionary representation of the final sudoku grid. False if no solution exists.
+        """
+        topology = get_topology(diagonal, size)
+        key, perm, labels = canonical_form(grid, topology)
+        cache_key = '{}{}:{}'.format('d' if diagonal else 's', size, key)
+
+        solved = self._get(cache_key)
+        if solved is None:
+            self.misses += 1
+            values = solution.solve(key, diagonal=diagonal, size=size, **kwargs)
+            solved = values and ''.join(values[box] for box in topology.boxes)
+            self._put(cache_key, solved)
+        else:
+            self.hits += 1
+        if not solved:
+            return False
+
+        # Undo the relabelling and the permutation; digits the grid never used
+        # map to whichever of its digits are left
+        unused = iter(d for d in topology.digits if d not in labels.values())
+        for d in topology.digits:
+            if d not in labels:
+                labels[d] = next(unused)
+        boxes = topology.boxes
+        return dict((boxes[perm[i]], labels[ch]) for i, ch in enumerate(solved))
+
+    def _get(self, key):
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+        if self.disk is not None and key in self.disk:
+            solved = self.disk[key]
+            self._remember(key, solved)
+            return solved
+        return None
+
+    def _put(self, key, solved):
+        self._remember(key, solved)
+        if self.disk is not None:
+            self.disk[key] = solved
+
+    def _remember(self, key, solved):
+        self.memory[key] = solved
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,87 @@
+import os
+import shutil
+import solution
+import solution_test
+import sudoku_batch_test
+import sudoku_cache
+import tempfile
+import unittest
+from sudoku_topology import DIAGONAL, STANDARD
+
+
+def swap_digits(grid, a, b):
+    return grid.translate(str.maketrans(a + b, b + a))
+
+
+class TestCanonicalForm(unittest.TestCase):
+    diagonal_grid = solution_test.TestDiagonalSudoku.diagonal_grid
+    grid = sudoku_batch_test.TestSolveMany.grids[0]
+
+    def test_diagonal_symmetries(self):
+        key = sudoku_cache.canonical_form(self.diagonal_grid, DIAGONAL)[0]
+        for perm in sudoku_cache._dihedral(9):
+            variant = swap_digits(''.join(self.diagonal_grid[j] for j in perm), '2', '7')
+            self.assertEqual(sudoku_cache.canonical_form(variant, DIAGONAL)[0], key)
+
+    def test_standard_symmetries(self):
+        key = sudoku_cache.canonical_form(self.grid, STANDARD)[0]
+        transposed = ''.join(self.grid[j] for j in sudoku_cache._transpose(9))
+        # Swap the first two bands
+        banded = self.grid[27:54] + self.grid[:27] + self.grid[54:]
+        for variant in (transposed, banded, swap_digits(self.grid, '1', '9')):
+            self.assertEqual(sudoku_cache.canonical_form(variant, STANDARD)[0], key)
+
+    def test_mapping(self):
+        key, perm, labels = sudoku_cache.canonical_form(self.grid, STANDARD)
+        self.assertEqual(''.join(labels.get(ch, '.') for ch in key), ''.join(self.grid[j] for j in perm))
+
+
+class TestSolveCache(unittest.TestCase):
+    diagonal_grid = solution_test.TestDiagonalSudoku.diagonal_grid
+    grids = sudoku_batch_test.TestSolveMany.grids
+
+    def test_hits(self):
+        cache = sudoku_cache.SolveCache()
+        self.assertEqual(cache.solve(self.diagonal_grid), solution_test.TestDiagonalSudoku.solved_diag_sudoku)
+        rotated = ''.join(self.diagonal_grid[j] for j in sudoku_cache._dihedral(9)[1])
+        variant = swap_digits(rotated, '3', '8')
+        self.assertEqual(cache.solve(variant), solution.solve(variant, engine='dlx'))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_standard(self):
+        cache = sudoku_cache.SolveCache()
+        for grid in self.grids[:3]:
+            transposed = ''.join(grid[j] for j in sudoku_cache._transpose(9))
+            for variant in (grid, transposed):
+                self.assertEqual(cache.solve(variant, diagonal=False),
+                                 solution.solve(variant, engine='dlx', diagonal=False))
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+
+    def test_no_solution(self):
+        cache = sudoku_cache.SolveCache()
+        self.assertIs(cache.solve(self.grids[3], diagonal=False), False)
+        self.assertIs(cache.solve(self.grids[3], diagonal=False), False)
+        self.assertEqual(cache.hits, 1)
+
+    def test_eviction(self):
+        cache = sudoku_cache.SolveCache(maxsize=2)
+        for grid in self.grids[:3]:
+            cache.solve(grid, diagonal=False)
+        self.assertEqual(len(cache.memory), 2)
+        cache.solve(self.grids[0], diagonal=False)
+        self.assertEqual(cache.misses, 4)
+
+    def test_shelve(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'solved')
+        try:
+            with sudoku_cache.SolveCache(path=path) as cache:
+                expected = cache.solve(self.grids[0], diagonal=False)
+            with sudoku_cache.SolveCache(path=path) as cache:
+                self.assertEqual(cache.solve(self.grids[0], diagonal=False), expected)
+                self.assertEqual((cache.hits, cache.misses), (1, 0))
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
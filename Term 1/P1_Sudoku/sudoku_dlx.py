@@ -0,0 +1,222 @@
+"""
+Exact-cover Sudoku backend using Knuth's Algorithm X with dancing links.
+
+A grid becomes an exact-cover problem with one row per (box, digit) choice and
+one column per constraint: every box holds exactly one digit, and every unit of
+the topology (rows, columns, squares and, on the diagonal board, the two
+diagonals) holds every digit exactly once. Givens are selected up front, then
+Algorithm X covers the remaining columns, always branching on the column with
+the fewest rows left.
+"""
+import sudoku_bitmask
+from sudoku_topology import DIAGONAL
+
+
+class DancingLinks(object):
+    """A sparse 0/1 matrix stored as circular doubly linked lists.
+
+    Node 0 is the root, nodes 1..ncols are the column headers, and every 1 in
+    the matrix is one more node. The links are kept in flat lists (L, R, U, D)
+    indexed by node, with C the column header and row the row id of each node.
+    """
+
+    def __init__(self, ncols):
+        n = ncols + 1
+        self.L = [i - 1 for i in range(n)]
+        self.L[0] = ncols
+        self.R = [i + 1 for i in range(n)]
+        self.R[ncols] = 0
+        self.U = list(range(n))
+        self.D = list(range(n))
+        self.C = list(range(n))
+        self.S = [0] * n
+        self.row = [None] * n
+        self.row_start = {}
+
+    def add_row(self, row_id, columns):
+        """Append a row with a 1 in each of the given columns (numbered from 0)."""
+        L, R, U, D = self.L, self.R, self.U, self.D
+        first = None
+        for c in columns:
+            c += 1
+            node = len(self.C)
+            self.C.append(c)
+            self.row.append(row_id)
+            # Link at the bottom of the column
+            U.append(U[c])
+            D.append(c)
+            D[U[c]] = node
+            U[c] = node
+            self.S[c] += 1
+            # Link at the end of the row
+            if first is None:
+                first = node
+                L.append(node)
+                R.append(node)
+            else:
+                L.append(L[first])
+                R.append(first)
+                R[L[first]] = node
+                L[first] = node
+        self.row_start[row_id] = first
+
+    def copy(self):
+        """Return an independent copy of the links, to search without touching this matrix."""
+        new = object.__new__(DancingLinks)
+        new.L, new.R, new.U, new.D = self.L[:], self.R[:], self.U[:], self.D[:]
+        new.C, new.S, new.row = self.C, self.S[:], self.row
+        new.row_start = self.row_start
+        return new
+
+    def cover(self, c):
+        """Remove column c and every row with a 1 in it."""
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, c):
+        """Undo cover(c)."""
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def select(self, row_id):
+        """
+        Commit to a row before searching, covering all of its columns.
+        Returns False if one of them is already covered by an earlier selection.
+        """
+        L, R, C = self.L, self.R, self.C
+        first = self.row_start[row_id]
+        node = first
+        while True:
+            c = C[node]
+            if R[L[c]] != c:
+                return False
+            node = R[node]
+            if node == first:
+                break
+        while True:
+            self.cover(C[node])
+            node = R[node]
+            if node == first:
+                return True
+
+    def solutions(self, chosen=None):
+        """Yield every exact cover of the columns left, as a list of row ids."""
+        L, R, D, C, S = self.L, self.R, self.D, self.C, self.S
+        if chosen is None:
+            chosen = []
+        if R[0] == 0:
+            yield list(chosen)
+            return
+
+        # Branch on the column with the fewest rows left
+        c = best = R[0]
+        while c != 0:
+            if S[c] < S[best]:
+                best = c
+            c = R[c]
+        if S[best] == 0:
+            return
+
+        self.cover(best)
+        r = D[best]
+        while r != best:
+            chosen.append(self.row[r])
+            j = R[r]
+            while j != r:
+                self.cover(C[j])
+                j = R[j]
+            for solution in self.solutions(chosen):
+                yield solution
+            j = L[r]
+            while j != r:
+                self.uncover(C[j])
+                j = L[j]
+            chosen.pop()
+            r = D[r]
+        self.uncover(best)
+
+
+_templates = {}
+
+
+def exact_cover(topology=DIAGONAL):
+    """
+    Return the empty-board exact-cover matrix of a topology, built once and cached.
+    Row box * n + d places digit d (from 0) in box; column box is "box is filled"
+    and column n_boxes + unit * n + d is "unit holds digit d".
+    """
+    if topology not in _templates:
+        n = len(topology.digits)
+        nboxes = len(topology.boxes)
+        links = DancingLinks(nboxes + len(topology.unitlist) * n)
+        for i in range(nboxes):
+            for d in range(n):
+                links.add_row(i * n + d, [i] + [nboxes + u * n + d for u in topology.box_units[i]])
+        _templates[topology] = links
+    return _templates[topology]
+
+
+def solutions(grid, topology=DIAGONAL):
+    """
+    Yield every solution of a grid in dictionary form.
+    Args:
+        grid(string): a string representing a sudoku grid.
+        topology(Topology): the board variant, diagonal by default as in `solution.solve`.
+    """
+    n = len(topology.digits)
+    links = exact_cover(topology).copy()
+    givens = []
+    popcount = sudoku_bitmask.masks(topology).popcount
+    for i, mask in enumerate(sudoku_bitmask.grid_cells(grid, topology)):
+        if popcount[mask] == 1:
+            row_id = i * n + mask.bit_length() - 1
+            if not links.select(row_id):
+                return
+            givens.append(row_id)
+
+    for rows in links.solutions(givens):
+        yield dict((topology.boxes[r // n], topology.digits[r % n]) for r in rows)
+
+
+def solve(grid, topology=DIAGONAL):
+    """
+    Find the solution to a Sudoku grid with dancing links.
+    Returns:
+        The dictionary representation of the final sudoku grid. False if no solution exists.
+    """
+    for values in solutions(grid, topology):
+        return values
+    return False
+
+
+def count_solutions(grid, topology=DIAGONAL, limit=None):
+    """
+    Count the solutions of a grid, stopping early once `limit` are found.
+    count_solutions(grid, limit=2) == 1 checks that a puzzle is unique.
+    """
+    count = 0
+    for _ in solutions(grid, topology):
+        count += 1
+        if count == limit:
+            break
+    return count
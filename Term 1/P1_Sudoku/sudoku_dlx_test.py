@@ -0,0 +1,35 @@
+import solution
+import solution_test
+import sudoku_batch_test
+import sudoku_dlx
+import unittest
+
+from sudoku_topology import STANDARD
+
+
+class TestDancingLinks(unittest.TestCase):
+    grids = sudoku_batch_test.TestSolveMany.grids
+
+    def test_solve_diagonal(self):
+        grid = solution_test.TestDiagonalSudoku.diagonal_grid
+        self.assertEqual(solution.solve(grid, engine='dlx'), solution_test.TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_solve_standard(self):
+        for grid in self.grids:
+            self.assertEqual(sudoku_dlx.solve(grid, STANDARD), solution.solve(grid, diagonal=False))
+
+    def test_count_solutions(self):
+        self.assertEqual(sudoku_dlx.count_solutions(self.grids[0], STANDARD), 1)
+        self.assertEqual(sudoku_dlx.count_solutions(solution_test.TestDiagonalSudoku.diagonal_grid), 1)
+        self.assertEqual(sudoku_dlx.count_solutions(self.grids[3], STANDARD), 0)
+        # Blanking a solved grid down to a few clues leaves many solutions
+        self.assertEqual(sudoku_dlx.count_solutions(self.grids[0][:20] + '.' * 61, STANDARD, limit=10), 10)
+
+    def test_template_untouched(self):
+        links = sudoku_dlx.exact_cover(STANDARD)
+        before = (links.L[:], links.R[:], links.S[:])
+        sudoku_dlx.count_solutions(self.grids[2], STANDARD, limit=2)
+        self.assertEqual((links.L, links.R, links.S), before)
+
+if __name__ == '__main__':
+    unittest.main()
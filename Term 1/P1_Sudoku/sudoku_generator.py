@@ -0,0 +1,219 @@
+"""
+Generate Sudoku puzzles with a unique solution and a target difficulty.
+
+A puzzle starts as a random full grid, filled by a randomised depth-first
+search over the bitmask engine. Clues are then removed one at a time (or one
+pair of rotationally symmetric boxes at a time) in random order, and a removal
+is only kept if the puzzle stays unique. Since the puzzle was unique before the
+removal, it stays unique exactly when no solution puts another digit in the
+emptied boxes, so every check is a search for a single solution of a puzzle
+that propagation usually refutes at once, rather than a count of all of them.
+Both the checks and the grading propagate incrementally, which about halves
+the time per puzzle over full sweeps.
+
+Difficulty is graded from the Stats of propagating with solution.reduce_puzzle()
+and every strategy of solution.STRATEGIES:
+    easy   - the basic strategies (eliminate, only choice, naked twins) solve it.
+    medium - the advanced strategies have to remove candidates too, but no search.
+    hard   - propagation alone gets stuck, and the solver has to search.
+
+Example:
+    puzzle = sudoku_generator.generate('medium', diagonal=False, seed=1)
+    for puzzle in generate_many(10000, 'hard', workers=8, seed=1):
+        ...
+"""
+import argparse
+import os
+import random
+import sys
+from functools import partial
+from multiprocessing import Pool
+
+import solution
+import sudoku_bitmask
+import sudoku_io
+from sudoku_stats import Stats
+from sudoku_topology import get_topology
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+def grade(grid, diagonal=True, size=3, stats=None):
+    """
+    Rate how hard a puzzle is to solve, see DIFFICULTIES.
+    Args:
+        grid(string): a string representing a sudoku grid.
+        stats(sudoku_stats.Stats): collects the counters the grade is based on, if given.
+    Returns:
+        'easy', 'medium' or 'hard', or None if the grid has no solution.
+    """
+    topology = get_topology(diagonal, size)
+    if stats is None:
+        stats = Stats()
+    values = solution.grid_values(grid, topology)
+    values = solution.reduce_puzzle(values, topology, incremental=True, stats=stats,
+                                    strategies=solution.STRATEGIES)
+    if values is False:
+        return None
+    if solution.solved_count(values) < len(topology.boxes):
+        return 'hard'
+    # The advanced strategies only run once the basic ones stop solving boxes,
+    # so any candidate they removed was needed
+    if any(stats.removed[name] for name in solution.ADVANCED_STRATEGIES):
+        return 'medium'
+    return 'easy'
+
+
+def _fill(cells, topology, rng):
+    """Randomised search(): complete cells into a random solution, or return False."""
+    cells = sudoku_bitmask.reduce_puzzle(cells, topology)
+    if cells is False:
+        return False
+
+    popcount = sudoku_bitmask.masks(topology).popcount
+    unsolved = [(popcount[m], i) for i, m in enumerate(cells) if popcount[m] > 1]
+    if not unsolved:
+        return cells
+
+    # Fewest candidates first as in search(), ties and digits in random order
+    fewest = min(unsolved)[0]
+    s = rng.choice([i for n, i in unsolved if n == fewest])
+    bits = [1 << i for i in range(len(topology.digits)) if cells[s] >> i & 1]
+    rng.shuffle(bits)
+    for bit in bits:
+        new_cells = cells[:]
+        new_cells[s] = bit
+        attempt = _fill(new_cells, topology, rng)
+        if attempt:
+            return attempt
+    return False
+
+
+def full_grid(topology, rng=random):
+    """Return the candidate masks of a random solved grid of a topology."""
+    return _fill([sudoku_bitmask.masks(topology).all] * len(topology.boxes), topology, rng)
+
+
+def _has_other_solution(cells, solved, emptied, topology):
+    """
+    Whether the puzzle in cells has a solution other than solved, given that
+    it had none before the boxes in emptied were emptied.
+    """
+    every = sudoku_bitmask.masks(topology).all
+    for i in emptied:
+        trial = cells[:]
+        trial[i] = every & ~solved[i]
+        if sudoku_bitmask.search(trial, topology, incremental=True):
+            return True
+    return False
+
+
+def generate(difficulty=None, diagonal=True, size=3, symmetric=True, seed=None, attempts=100):
+    """
+    Generate a puzzle with a unique solution.
+    Args:
+        difficulty(string): one of DIFFICULTIES; None keeps removing clues for as
+            long as the puzzle stays unique, whatever its difficulty.
+        diagonal(bool): also constrain the two main diagonals.
+        size(int): the width of a square, 3 for the classic 9x9 board.
+        symmetric(bool): remove clues in pairs of boxes symmetric about the center.
+        seed: seeds the random numbers, for a reproducible puzzle.
+        attempts(int): full grids tried before giving up on the difficulty.
+    Returns:
+        The puzzle in string form, '.' for empties.
+    Raises:
+        ValueError: for an unknown difficulty.
+        RuntimeError: if no puzzle of the difficulty was found within attempts.
+    """
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError("Unknown difficulty: {}".format(difficulty))
+    topology = get_topology(diagonal, size)
+    rng = random.Random(seed)
+    every = sudoku_bitmask.masks(topology).all
+    last = len(topology.boxes) - 1
+    # Grading costs more than the uniqueness check, and is only needed to keep
+    # a puzzle from getting harder than the target
+    ceiling = None if difficulty in (None, DIFFICULTIES[-1]) else DIFFICULTIES.index(difficulty)
+
+    for _ in range(attempts):
+        solved = full_grid(topology, rng)
+        cells = solved[:]
+        order = list(range(len(cells)))
+        rng.shuffle(order)
+        for i in order:
+            if cells[i] == every:
+                continue
+            emptied = sorted(set([i, last - i])) if symmetric else [i]
+            for j in emptied:
+                cells[j] = every
+            if _has_other_solution(cells, solved, emptied, topology) or (
+                    ceiling is not None and
+                    DIFFICULTIES.index(grade(_grid(cells, topology), diagonal, size)) > ceiling):
+                for j in emptied:
+                    cells[j] = solved[j]
+
+        puzzle = _grid(cells, topology)
+        if difficulty is None or grade(puzzle, diagonal, size) == difficulty:
+            return puzzle
+    raise RuntimeError("No {} puzzle found in {} attempts".format(difficulty, attempts))
+
+
+def _grid(cells, topology):
+    return sudoku_io.encode(cells, topology).decode('ascii')
+
+
+def _generate_job(index, seed, difficulty, diagonal, size, symmetric):
+    return generate(difficulty, diagonal, size, symmetric, None if seed is None else '{}:{}'.format(seed, index))
+
+
+def generate_many(count, difficulty=None, workers=None, chunksize=8, diagonal=True, size=3, symmetric=True,
+                  seed=None):
+    """
+    Generate puzzles across a pool of worker processes.
+    Args:
+        count(int): number of puzzles.
+        workers(int): number of worker processes, os.cpu_count() by default.
+            1 generates in the calling process.
+        chunksize(int): number of puzzles handed to a worker at a time.
+        seed: seeds every puzzle from this and its index, for a reproducible batch.
+        See generate() for the other arguments.
+    Yields:
+        The puzzles in string form, in the order they are generated.
+    """
+    job = partial(_generate_job, seed=seed, difficulty=difficulty, diagonal=diagonal, size=size,
+                  symmetric=symmetric)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for index in range(count):
+            yield job(index)
+        return
+    with Pool(workers) as pool:
+        for puzzle in pool.imap(job, range(count), chunksize):
+            yield puzzle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('count', type=int, help='number of puzzles to generate')
+    parser.add_argument('--difficulty', choices=DIFFICULTIES, help='difficulty to target (default: any)')
+    parser.add_argument('--standard', action='store_true', help='leave the diagonals unconstrained')
+    parser.add_argument('--size', type=int, default=3, help='width of a square, 3 for 9x9 boards')
+    parser.add_argument('--asymmetric', action='store_true', help='remove clues one box at a time')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--seed', help='seed for a reproducible batch')
+    parser.add_argument('--output', help='write the puzzles to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for puzzle in generate_many(args.count, args.difficulty, args.workers, diagonal=not args.standard,
+                                    size=args.size, symmetric=not args.asymmetric, seed=args.seed):
+            out.write(puzzle + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import os
+import random
+import solution_test
+import sudoku_bitmask
+import sudoku_dlx
+import sudoku_generator
+import tempfile
+import unittest
+from sudoku_topology import DIAGONAL, STANDARD, get_topology
+
+
+class TestGenerator(unittest.TestCase):
+
+    def assertUnique(self, puzzle, topology):
+        self.assertEqual(sudoku_dlx.count_solutions(puzzle, topology, limit=2), 1)
+
+    def test_full_grid(self):
+        cells = sudoku_generator.full_grid(DIAGONAL, random.Random(3))
+        values = sudoku_bitmask.cells_values(cells, DIAGONAL)
+        for unit in DIAGONAL.unitlist:
+            self.assertEqual(sorted(values[box] for box in unit), list(DIAGONAL.digits))
+
+    def test_symmetric_and_unique(self):
+        for diagonal in (False, True):
+            topology = get_topology(diagonal)
+            puzzle = sudoku_generator.generate(diagonal=diagonal, seed=5)
+            self.assertUnique(puzzle, topology)
+            for i in range(81):
+                self.assertEqual(puzzle[i] == '.', puzzle[80 - i] == '.')
+
+    def test_reproducible(self):
+        self.assertEqual(sudoku_generator.generate(diagonal=False, seed=2),
+                         sudoku_generator.generate(diagonal=False, seed=2))
+
+    def test_difficulty(self):
+        for difficulty in sudoku_generator.DIFFICULTIES:
+            puzzle = sudoku_generator.generate(difficulty, diagonal=False, symmetric=False, seed=1)
+            self.assertUnique(puzzle, STANDARD)
+            self.assertEqual(sudoku_generator.grade(puzzle, diagonal=False), difficulty)
+        with self.assertRaises(ValueError):
+            sudoku_generator.generate('fiendish')
+
+    def test_grade(self):
+        self.assertEqual(sudoku_generator.grade(solution_test.TestDiagonalSudoku.diagonal_grid), 'easy')
+        pathological = '.....6....59.....82....8....45........3........6..3.54...325..6..................'
+        self.assertEqual(sudoku_generator.grade(pathological, diagonal=False), 'hard')
+        self.assertIsNone(sudoku_generator.grade('11' + '.' * 79, diagonal=False))
+
+    def test_generate_many(self):
+        puzzles = list(sudoku_generator.generate_many(3, workers=2, chunksize=1, diagonal=False, seed=7))
+        self.assertEqual(puzzles, [sudoku_generator.generate(diagonal=False, seed='7:{}'.format(i))
+                                   for i in range(3)])
+
+    def test_main(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            path = f.name
+        try:
+            sudoku_generator.main(['2', '--standard', '--workers', '1', '--seed', '1', '--output', path])
+            with open(path) as f:
+                puzzles = f.read().split()
+        finally:
+            os.remove(path)
+        self.assertEqual(len(puzzles), 2)
+        for puzzle in puzzles:
+            self.assertUnique(puzzle, STANDARD)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Bulk reading and writing of puzzle files.
+
+A puzzle file holds one grid per line in the usual one-line form: the boxes in
+row-major order, '.' or '0' for empties. Blank lines and lines starting with
+'#' are skipped. Lines are read as bytes, optionally through a memory map, and
+decoded with a 256-entry table straight into the candidate masks of
+sudoku_bitmask.py. Solutions are encoded back from masks the same way, so no
+strings or dicts are built per box on either side.
+
+Example:
+    with open('solutions.txt', 'wb') as out:
+        write_cells(out, (sudoku_bitmask.search(cells) for cells in read_cells('puzzles.txt')))
+"""
+import mmap
+
+import sudoku_bitmask
+from sudoku_topology import DIAGONAL
+
+_decode_tables = {}
+_encode_tables = {}
+
+
+def decode_table(topology=DIAGONAL):
+    """
+    Return the byte -> candidate mask table of a topology.
+    Bytes that are neither a digit nor an empty marker map to None.
+    """
+    if topology.digits not in _decode_tables:
+        m = sudoku_bitmask.masks(topology)
+        table = [None] * 256
+        table[ord('.')] = table[ord('0')] = m.all
+        for d, bit in m.bit.items():
+            table[ord(d)] = bit
+        _decode_tables[topology.digits] = table
+    return _decode_tables[topology.digits]
+
+
+def encode_table(topology=DIAGONAL):
+    """Return the candidate mask -> byte table of a topology, for the masks of solved boxes."""
+    if topology.digits not in _encode_tables:
+        m = sudoku_bitmask.masks(topology)
+        _encode_tables[topology.digits] = dict((bit, ord(d)) for d, bit in m.bit.items())
+    return _encode_tables[topology.digits]
+
+
+def iter_lines(path, use_mmap=False):
+    """
+    Yield the grid lines of a puzzle file as bytes, without the line ending.
+    Args:
+        path(str): the puzzle file.
+        use_mmap(bool): read through a memory map rather than a buffered file,
+            which avoids copying large corpora into the process heap.
+    """
+    with open(path, 'rb') as f:
+        if use_mmap:
+            try:
+                source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return
+        else:
+            source = f
+        try:
+            for line in iter(source.readline, b''):
+                line = line.strip()
+                if line and not line.startswith(b'#'):
+                    yield line
+        finally:
+            if use_mmap:
+                source.close()
+
+
+def decode(line, topology=DIAGONAL):
+    """
+    Convert one grid line into a list of candidate masks, one per box.
+    Args:
+        line(bytes or str): a grid in one-line form, '.' or '0' for empties.
+    Raises:
+        ValueError: if the line has the wrong length or an unknown character.
+    """
+    if isinstance(line, str):
+        line = line.encode('ascii')
+    if len(line) != len(topology.boxes):
+        raise ValueError("Expected {} boxes, got {}".format(len(topology.boxes), len(line)))
+    table = decode_table(topology)
+    cells = [table[b] for b in line]
+    if None in cells:
+        raise ValueError("Unexpected character in grid: {!r}".format(line))
+    return cells
+
+
+def encode(cells, topology=DIAGONAL):
+    """Convert a list of candidate masks into a grid line (bytes), '.' for unsolved boxes."""
+    get = encode_table(topology).get
+    return bytes([get(mask, 46) for mask in cells])
+
+
+def read_cells(path, topology=DIAGONAL, use_mmap=False):
+    """Yield the candidate masks of every grid of a puzzle file."""
+    for line in iter_lines(path, use_mmap):
+        yield decode(line, topology)
+
+
+def write_cells(f, solutions, topology=DIAGONAL):
+    """
+    Write solutions to a binary file, one grid line each.
+    Args:
+        f: a file opened in binary mode.
+        solutions(iterable): lists of candidate masks, or False for grids without
+            a solution, which are written as a line of '.'.
+    Returns:
+        The number of lines written.
+    """
+    empty = b'.' * len(topology.boxes)
+    count = 0
+    for cells in solutions:
+        f.write((encode(cells, topology) if cells else empty) + b'\n')
+        count += 1
+    return count
@@ -0,0 +1,62 @@
+import io
+import os
+import sudoku_batch
+import sudoku_batch_test
+import sudoku_bitmask
+import sudoku_io
+import tempfile
+import unittest
+
+from sudoku_topology import STANDARD
+
+
+class TestSudokuIO(unittest.TestCase):
+    grids = sudoku_batch_test.TestSolveMany.grids
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write('# corpus\n' + '\n\n'.join(self.grids).replace('.', '0', 81) + '\r\n')
+        self.path = f.name
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_iter_lines(self):
+        for use_mmap in (False, True):
+            lines = list(sudoku_io.iter_lines(self.path, use_mmap))
+            self.assertEqual(len(lines), len(self.grids))
+            self.assertEqual(lines[2], self.grids[2].encode('ascii'))
+
+    def test_empty_file(self):
+        with open(self.path, 'w'):
+            pass
+        self.assertEqual(list(sudoku_io.iter_lines(self.path, use_mmap=True)), [])
+
+    def test_decode(self):
+        for cells, grid in zip(sudoku_io.read_cells(self.path, STANDARD), self.grids):
+            self.assertEqual(cells, sudoku_bitmask.grid_cells(grid, STANDARD))
+        with self.assertRaises(ValueError):
+            sudoku_io.decode('x' * 81)
+        with self.assertRaises(ValueError):
+            sudoku_io.decode('.' * 80)
+
+    def test_write_cells(self):
+        solutions = [sudoku_bitmask.search(cells, STANDARD) for cells in sudoku_io.read_cells(self.path, STANDARD)]
+        out = io.BytesIO()
+        self.assertEqual(sudoku_io.write_cells(out, solutions, STANDARD), len(self.grids))
+        expected = [result or '.' * 81 for _, result in sudoku_batch.solve_many(self.grids, workers=1, diagonal=False)]
+        self.assertEqual(out.getvalue().decode('ascii').splitlines(), expected)
+
+    def test_solve_file(self):
+        dst = self.path + '.out'
+        try:
+            self.assertEqual(sudoku_batch.solve_file(self.path, dst, workers=1, diagonal=False, use_mmap=True), len(self.grids))
+            with open(dst) as f:
+                solved = f.read().splitlines()
+        finally:
+            os.remove(dst)
+        expected = [result or '.' * 81 for _, result in sudoku_batch.solve_many(self.grids, workers=1, diagonal=False)]
+        self.assertEqual(solved, expected)
+
+if __name__ == '__main__':
+    unittest.main()
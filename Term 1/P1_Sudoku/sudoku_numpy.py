@@ -0,0 +1,140 @@
+"""
+Vectorized constraint propagation over many Sudoku grids at once.
+
+A batch of N puzzles is held as an (N, 81) uint16 array of the candidate masks
+used by sudoku_bitmask.py. Elimination and hidden singles (only_choice) are
+applied to the whole batch with NumPy operations until no puzzle changes any
+more; only the puzzles still left open afterwards are handed, one by one, to
+the depth-first `sudoku_bitmask.search()`.
+
+Only the classic 9x9 boards are supported, since the masks are held as uint16.
+Requires NumPy.
+"""
+import numpy as np
+
+import sudoku_bitmask
+from sudoku_topology import DIAGONAL
+
+POPCOUNT = np.array(sudoku_bitmask.POPCOUNT, dtype=np.uint8)
+BITS = np.array([sudoku_bitmask.BIT[d] for d in sudoku_bitmask.DIGITS], dtype=np.uint16)
+
+# ASCII code -> candidate mask; '.' and '0' are empty boxes, anything else is
+# an impossible box and makes the puzzle fail propagation
+DECODE = np.zeros(256, dtype=np.uint16)
+DECODE[ord('.')] = DECODE[ord('0')] = sudoku_bitmask.ALL_DIGITS
+for _d in sudoku_bitmask.DIGITS:
+    DECODE[ord(_d)] = sudoku_bitmask.BIT[_d]
+
+# Candidate mask -> ASCII code, '.' for boxes that are not solved
+ENCODE = np.array([ord(s) if len(s) == 1 else ord('.') for s in sudoku_bitmask.MASK_DIGITS], dtype=np.uint8)
+
+_index_tables = {}
+
+
+def index_tables(topology=DIAGONAL):
+    """
+    Return (peers, units) index arrays for a topology.
+    Peer lists differ in length on the diagonal board, so they are padded with
+    index 81, which points at an always-empty column.
+    """
+    if topology not in _index_tables:
+        width = max(len(p) for p in topology.peer_indices)
+        peers = np.full((len(topology.boxes), width), len(topology.boxes), dtype=np.intp)
+        for i, p in enumerate(topology.peer_indices):
+            peers[i, :len(p)] = p
+        units = np.array(topology.unit_indices, dtype=np.intp)
+        _index_tables[topology] = (peers, units)
+    return _index_tables[topology]
+
+
+def grids_array(grids):
+    """
+    Decode 81-char grids into an (N, 81) array of candidate masks.
+    Args:
+        grids(iterable): grids in string form, '.' or '0' for empties.
+    """
+    grids = list(grids)
+    assert all(len(grid) == 81 for grid in grids)
+    codes = np.frombuffer(''.join(grids).encode('ascii'), dtype=np.uint8)
+    return DECODE[codes].reshape(len(grids), 81)
+
+
+def array_grids(cells):
+    """Encode an (N, 81) array of candidate masks as 81-char grids, '.' for unsolved boxes."""
+    text = ENCODE[cells].tobytes().decode('ascii')
+    return [text[i:i + 81] for i in range(0, len(text), 81)]
+
+
+def eliminate(cells, peers):
+    """Remove the value of every solved box from its peers, for every puzzle of the batch."""
+    solved = np.zeros((cells.shape[0], cells.shape[1] + 1), dtype=np.uint16)
+    solved[:, :-1] = np.where(POPCOUNT[cells] == 1, cells, 0)
+    taken = np.bitwise_or.reduce(solved[:, peers], axis=2)
+    return cells & ~taken
+
+
+def only_choice(cells, units):
+    """
+    Assign every digit that only fits in one box of a unit to that box, for every
+    puzzle of the batch.
+    Returns the new cells and a boolean array flagging the puzzles in which
+    some digit no longer fits anywhere in some unit.
+    """
+    # (N, units, boxes of the unit, digits)
+    places = (cells[:, units][..., np.newaxis] & BITS) != 0
+    counts = places.sum(axis=2)
+    n, u, d = np.nonzero(counts == 1)
+    if len(n):
+        position = places[n, u, :, d].argmax(axis=1)
+        cells = cells.copy()
+        cells[n, units[u, position]] = BITS[d]
+    return cells, (counts == 0).any(axis=(1, 2))
+
+
+def propagate(cells, topology=DIAGONAL):
+    """
+    Iterate eliminate() and only_choice() over a batch until no puzzle changes.
+    Args:
+        cells: an (N, 81) array of candidate masks, as built by grids_array().
+    Returns:
+        (cells, solved, failed): the reduced copy of the batch, and boolean arrays
+        flagging the puzzles that are solved and those that have no solution.
+    """
+    if topology.size != 3:
+        raise ValueError("Only 9x9 boards can be propagated as a batch")
+    peers, units = index_tables(topology)
+    cells = np.array(cells, dtype=np.uint16)
+    failed = np.zeros(len(cells), dtype=bool)
+
+    # Only the puzzles that changed in the last pass are propagated again
+    active = np.arange(len(cells))
+    while len(active):
+        before = cells[active]
+        after, stuck = only_choice(eliminate(before, peers), units)
+        stuck |= (after == 0).any(axis=1)
+        cells[active] = after
+        failed[active[stuck]] = True
+        changed = (after != before).any(axis=1)
+        active = active[changed & ~stuck]
+
+    solved = (POPCOUNT[cells] == 1).all(axis=1) & ~failed
+    return cells, solved, failed
+
+
+def solve_batch(grids, topology=DIAGONAL):
+    """
+    Solve a batch of grids, propagating them all together and only searching the
+    ones propagation could not finish.
+    Args:
+        grids(iterable): 81-char grids in string form.
+    Returns:
+        A list with the solved 81-char grid, or False, for each input grid.
+    """
+    cells, solved, failed = propagate(grids_array(grids), topology)
+    results = array_grids(cells)
+    for i in np.nonzero(~solved & ~failed)[0]:
+        attempt = sudoku_bitmask.search(cells[i].tolist(), topology)
+        results[i] = attempt and sudoku_bitmask.cells_grid(attempt, topology)
+    for i in np.nonzero(failed)[0]:
+        results[i] = False
+    return results
@@ -0,0 +1,43 @@
+import solution_test
+import sudoku_bitmask
+import sudoku_batch
+import sudoku_batch_test
+import unittest
+
+from sudoku_topology import STANDARD
+
+try:
+    import sudoku_numpy
+except ImportError:
+    sudoku_numpy = None
+
+
+@unittest.skipIf(sudoku_numpy is None, "NumPy is not installed")
+class TestNumpyBatch(unittest.TestCase):
+
+    def test_round_trip(self):
+        grids = sudoku_batch_test.TestSolveMany.grids[:3]
+        self.assertEqual(sudoku_numpy.array_grids(sudoku_numpy.grids_array(grids)), grids)
+
+    def test_propagate_matches_bitmask(self):
+        grids = sudoku_batch_test.TestSolveMany.grids[:3]
+        cells, solved, failed = sudoku_numpy.propagate(sudoku_numpy.grids_array(grids), STANDARD)
+        self.assertEqual(list(solved), [True, True, False])
+        self.assertEqual(list(failed), [False, False, False])
+        for grid, row in zip(grids, cells):
+            # Never prunes a candidate the bitmask solution still needs
+            solved_cells = sudoku_bitmask.search(sudoku_bitmask.grid_cells(grid), STANDARD)
+            self.assertTrue(all(m & s for m, s in zip(row.tolist(), solved_cells)))
+
+    def test_solve_batch(self):
+        grids = sudoku_batch_test.TestSolveMany.grids
+        expected = [solved for _, solved in sudoku_batch.solve_many(grids, workers=1, diagonal=False)]
+        self.assertEqual(sudoku_numpy.solve_batch(grids, STANDARD), expected)
+
+    def test_solve_batch_diagonal(self):
+        solved = sudoku_numpy.solve_batch([solution_test.TestDiagonalSudoku.diagonal_grid])[0]
+        expected = solution_test.TestDiagonalSudoku.solved_diag_sudoku
+        self.assertEqual(solved, ''.join(expected[box] for box in sorted(expected)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Portfolio search: race several solver configurations on one puzzle.
+
+On the worst puzzles one branching order or engine can take orders of
+magnitude longer than another, and which one wins is hard to tell in advance.
+race() starts each configuration in its own worker process, returns the first
+answer to come back and terminates the rest, so the latency of a puzzle is
+bounded by its best configuration rather than by the one picked up front.
+
+Example:
+    values = sudoku_portfolio.solve(grid, workers=4)
+"""
+import os
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
+from time import monotonic
+
+import solution
+from sudoku_topology import get_topology
+
+# Keyword arguments for solution.solve(), most reliable first; with fewer workers
+# than configurations only the first ones are raced
+PORTFOLIO = (
+    {'engine': 'dlx'},
+    {'engine': 'bitmask'},
+    {'engine': 'dict', 'branching': solution.Branching(degree=True)},
+    {'engine': 'dict', 'branching': solution.Branching(degree=True, lcv=True)},
+    {'engine': 'bitmask', 'incremental': True},
+    {'engine': 'dict', 'incremental': True, 'trail': True},
+)
+
+
+def _run(conn, grid, config, diagonal, size):
+    """Solve grid with one configuration and send back (True, solved grid string or False)."""
+    try:
+        values = solution.solve(grid, diagonal=diagonal, size=size, **config)
+        topology = get_topology(diagonal, size)
+        conn.send((True, values and ''.join(values[box] for box in topology.boxes)))
+    except Exception as e:
+        conn.send((False, repr(e)))
+    finally:
+        conn.close()
+
+
+def race(grid, configs=PORTFOLIO, workers=None, diagonal=True, size=3, timeout=None):
+    """
+    Solve one grid with several configurations at once and keep the first answer.
+    Args:
+        grid(string): a string representing a sudoku grid.
+        configs(sequence): keyword arguments for `solution.solve`, one dict per configuration.
+        workers(int): number of configurations raced, each in its own process;
+            os.cpu_count() by default. 1 solves with the first one in the calling process.
+        diagonal(bool): also constrain the two main diagonals.
+        size(int): the width of a square, 3 for the classic 9x9 board.
+        timeout(float): seconds to wait for an answer, None to wait for ever. A single
+            configuration solved in the calling process can't be interrupted, so there
+            the answer is waited for in full and dropped if it came too late.
+    Returns:
+        (index, values): the position in configs of the configuration that answered first,
+        and the dictionary representation of the solved grid, or False if it has no solution.
+    Raises:
+        TimeoutError: if no configuration answered within timeout.
+        RuntimeError: if every configuration failed with an exception.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    configs = list(configs)[:max(1, workers)]
+    if len(configs) == 1:
+        start = monotonic()
+        try:
+            values = solution.solve(grid, diagonal=diagonal, size=size, **configs[0])
+        except Exception as e:
+            raise RuntimeError("Every configuration failed: {!r}".format(e))
+        if timeout is not None and monotonic() - start > timeout:
+            raise TimeoutError("No configuration answered within {} seconds".format(timeout))
+        return 0, values
+
+    readers = {}
+    processes = []
+    try:
+        for index, config in enumerate(configs):
+            reader, writer = Pipe(duplex=False)
+            process = Process(target=_run, args=(writer, grid, config, diagonal, size), daemon=True)
+            process.start()
+            # Close the parent's copy, so the reader hits EOF if the worker dies
+            writer.close()
+            readers[reader] = index
+            processes.append(process)
+
+        deadline = None if timeout is None else monotonic() + timeout
+        errors = []
+        while readers:
+            remaining = None if deadline is None else max(0, deadline - monotonic())
+            ready = wait(list(readers), remaining)
+            if not ready:
+                raise TimeoutError("No configuration answered within {} seconds".format(timeout))
+            for reader in ready:
+                index = readers.pop(reader)
+                try:
+                    ok, answer = reader.recv()
+                except EOFError:
+                    ok, answer = False, "worker {} exited without answering".format(index)
+                finally:
+                    reader.close()
+                if not ok:
+                    errors.append(answer)
+                    continue
+                topology = get_topology(diagonal, size)
+                return index, answer and dict(zip(topology.boxes, answer))
+        raise RuntimeError("Every configuration failed: {}".format('; '.join(errors)))
+    finally:
+        # Cancel the configurations still searching
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        for reader in readers:
+            reader.close()
+
+
+def solve(grid, configs=PORTFOLIO, workers=None, diagonal=True, size=3, timeout=None):
+    """
+    Find the solution to a Sudoku grid with the first configuration of a portfolio to answer.
+    See race() for the arguments.
+    Returns:
+        The dictionary representation of the final sudoku grid. False if no solution exists.
+    """
+    return race(grid, configs, workers, diagonal, size, timeout)[1]
@@ -0,0 +1,53 @@
+import solution
+import solution_test
+import sudoku_batch_test
+import sudoku_portfolio
+import time
+import unittest
+
+
+class TestPortfolio(unittest.TestCase):
+    grids = sudoku_batch_test.TestSolveMany.grids
+    # Takes the dict engine minutes without the advanced strategies, dancing links milliseconds
+    pathological = '.....6....59.....82....8....45........3........6..3.54...325..6..................'
+
+    def test_solve(self):
+        grid = solution_test.TestDiagonalSudoku.diagonal_grid
+        self.assertEqual(sudoku_portfolio.solve(grid, workers=3), solution_test.TestDiagonalSudoku.solved_diag_sudoku)
+
+    def test_inline(self):
+        index, values = sudoku_portfolio.race(self.grids[0], workers=1, diagonal=False)
+        self.assertEqual(index, 0)
+        self.assertEqual(values, solution.solve(self.grids[0], diagonal=False))
+
+    def test_inline_contract(self):
+        configs = ({'engine': 'dict', 'strategies': solution.BASIC_STRATEGIES},)
+        with self.assertRaises(TimeoutError):
+            sudoku_portfolio.race(self.grids[0], configs, diagonal=False, timeout=0)
+        with self.assertRaises(RuntimeError):
+            sudoku_portfolio.race(self.grids[0], ({'engine': 'nope'},), diagonal=False)
+
+    def test_no_solution(self):
+        self.assertIs(sudoku_portfolio.solve(self.grids[3], workers=2, diagonal=False), False)
+
+    def test_first_answer_wins(self):
+        configs = ({'engine': 'dict', 'strategies': solution.BASIC_STRATEGIES}, {'engine': 'dlx'})
+        start = time.time()
+        index, values = sudoku_portfolio.race(self.pathological, configs, workers=2, diagonal=False)
+        self.assertEqual(index, 1)
+        self.assertEqual(values, solution.solve(self.pathological, engine='dlx', diagonal=False))
+        self.assertLess(time.time() - start, 10)
+
+    def test_timeout(self):
+        configs = ({'engine': 'dict', 'strategies': solution.BASIC_STRATEGIES},) * 2
+        with self.assertRaises(TimeoutError):
+            sudoku_portfolio.race(self.pathological, configs, workers=2, diagonal=False, timeout=0.2)
+
+    def test_errors(self):
+        configs = ({'engine': 'nope'}, {'engine': 'dict'})
+        self.assertEqual(sudoku_portfolio.race(self.grids[0], configs, workers=2, diagonal=False)[0], 1)
+        with self.assertRaises(RuntimeError):
+            sudoku_portfolio.race(self.grids[0], configs[:1] * 2, workers=2, diagonal=False)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Counters collected while solving, to see which strategies pay their way.
+
+Pass a Stats to `solution.solve()` (dict and bitmask engines) and read it back
+afterwards; nothing is measured otherwise, so the solvers pay nothing for the
+instrumentation unless it is asked for.
+"""
+from collections import Counter
+from time import perf_counter
+
+
+class Stats(object):
+    """Work done by the strategies and the search of one or more solves.
+
+    Attributes
+    ----------
+    removed : Counter<str, int>
+        Candidates removed by each strategy.
+
+    time : Counter<str, float>
+        Seconds spent in each strategy.
+
+    calls : Counter<str, int>
+        Times each strategy was applied.
+
+    rounds : int
+        Propagation rounds run by reduce_puzzle(): full sweeps of the strategies,
+        or passes over the work queue when propagating incrementally.
+
+    stalls : int
+        Rounds that solved no new box, after which reduce_puzzle() gives up
+        (or tries the larger naked subsets first).
+
+    nodes, branches, max_depth : int
+        Search nodes visited, branches tried at them, and the deepest node.
+    """
+
+    def __init__(self):
+        self.removed = Counter()
+        self.time = Counter()
+        self.calls = Counter()
+        self.rounds = 0
+        self.stalls = 0
+        self.nodes = 0
+        self.branches = 0
+        self.max_depth = 0
+
+    def add(self, strategy, removed, elapsed):
+        "Account for one application of a strategy."
+        self.removed[strategy] += removed
+        self.time[strategy] += elapsed
+        self.calls[strategy] += 1
+
+    def measure(self, strategy, candidates, values, *args):
+        """
+        Apply strategy(values, *args) and account for it.
+        Args:
+            candidates(function): counts the candidates left in values.
+        """
+        before = candidates(values)
+        start = perf_counter()
+        result = strategy(values, *args)
+        self.add(strategy.__name__, before - candidates(values), perf_counter() - start)
+        return result
+
+    def node(self, depth):
+        "Account for a search node at the given depth, 0 for the root."
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def merge(self, other):
+        "Add the counters of another Stats into this one."
+        self.removed.update(other.removed)
+        self.time.update(other.time)
+        self.calls.update(other.calls)
+        self.rounds += other.rounds
+        self.stalls += other.stalls
+        self.nodes += other.nodes
+        self.branches += other.branches
+        self.max_depth = max(self.max_depth, other.max_depth)
+
+    def as_dict(self):
+        "Return the counters as plain, JSON-ready types."
+        return {
+            'strategies': dict((name, {'removed': self.removed[name],
+                                       'time': self.time[name],
+                                       'calls': self.calls[name]})
+                               for name in sorted(self.calls)),
+            'rounds': self.rounds,
+            'stalls': self.stalls,
+            'nodes': self.nodes,
+            'branches': self.branches,
+            'max_depth': self.max_depth,
+        }
+
+    def __repr__(self):
+        return 'Stats({!r})'.format(self.as_dict())
@@ -0,0 +1,52 @@
+import solution
+import sudoku_batch_test
+import unittest
+
+from sudoku_stats import Stats
+
+
+class TestStats(unittest.TestCase):
+    grid = sudoku_batch_test.TestSolveMany.grids[2]
+
+    def solve(self, **kwargs):
+        stats = Stats()
+        self.assertTrue(solution.solve(self.grid, diagonal=False, stats=stats, **kwargs))
+        return stats
+
+    def test_counters(self):
+        # The advanced strategies solve this grid without branching
+        for engine, strategies in (('dict', solution.BASIC_STRATEGIES), ('bitmask', None)):
+            for incremental in (False, True):
+                stats = self.solve(engine=engine, incremental=incremental, strategies=strategies)
+                self.assertGreater(stats.removed['eliminate'], 0)
+                self.assertGreater(stats.time['eliminate'], 0)
+                self.assertEqual(set(['eliminate', 'only_choice', 'naked_twins']) - set(stats.calls), set())
+                self.assertGreaterEqual(stats.rounds, stats.stalls)
+                self.assertGreater(stats.stalls, 0)
+                self.assertGreater(stats.branches, 0)
+                self.assertEqual(stats.nodes, stats.branches + 1)
+                self.assertGreater(stats.max_depth, 0)
+
+    def test_trail(self):
+        stats = self.solve(trail=True)
+        self.assertEqual(stats.nodes, stats.branches + 1)
+
+    def test_same_solution(self):
+        self.assertEqual(solution.solve(self.grid, diagonal=False, stats=Stats()),
+                         solution.solve(self.grid, diagonal=False))
+
+    def test_merge(self):
+        total = self.solve()
+        total.merge(self.solve())
+        single = self.solve()
+        self.assertEqual(total.nodes, 2 * single.nodes)
+        self.assertEqual(total.removed, single.removed + single.removed)
+        self.assertEqual(total.max_depth, single.max_depth)
+        self.assertEqual(set(total.as_dict()), set(['strategies', 'rounds', 'stalls', 'nodes', 'branches', 'max_depth']))
+
+    def test_dlx(self):
+        with self.assertRaises(ValueError):
+            solution.solve(self.grid, engine='dlx', stats=Stats())
+
+if __name__ == '__main__':
+    unittest.main()
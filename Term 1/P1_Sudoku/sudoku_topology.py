@@ -0,0 +1,153 @@
+"""
+Board topology shared by the Sudoku solvers.
+
+The boxes, units and peers of a board never change, so each variant (board
+size, standard or diagonal) is built once per process and handed to every
+strategy function.
+A Topology is immutable: lists are stored as tuples, lookups as read-only
+mappings, and the same instance is returned on every call to get_topology().
+"""
+from types import MappingProxyType
+
+ROW_LABELS = 'ABCDEFGHIJKLMNOPQRSTUVWXY'
+DIGIT_LABELS = '123456789ABCDEFGHIJKLMNOP'
+
+
+def cross(A, B):
+    "Cross product of elements in A and elements in B."
+    return [s + t for s in A for t in B]
+
+
+class Topology(object):
+    """The units and peers of an N x N Sudoku board made of size x size squares.
+
+    Attributes
+    ----------
+    size, side : int
+        The width of a square and of the board (3 and 9 for the classic board).
+
+    rows, cols : tuple<str>
+        The row labels ('A', 'B', ...) and column labels ('1', '2', ..., '16').
+
+    digits : str
+        The symbols a box can hold: '1'-'9', then 'A', 'B', ... on larger boards.
+
+    diagonal : bool
+        Whether the two main diagonals are units as well.
+
+    boxes : tuple<str>
+        Every box name ('A1', 'A2', ...) in row-major order.
+
+    unitlist : tuple<tuple<str>>
+        Every unit: rows, then columns, then squares, then the diagonals.
+
+    units, peers : mapping<str, tuple>
+        The units containing each box and the other boxes sharing one with it.
+
+    index : mapping<str, int>
+        The position of each box in `boxes`.
+
+    unit_indices, peer_indices : tuple<tuple<int>>
+        `unitlist` and `peers` expressed as positions in `boxes`, for the
+        array-backed engines.
+
+    box_units : tuple<tuple<int>>
+        For each position in `boxes`, the positions in `unitlist` of the
+        units containing that box.
+
+    intersections : tuple<tuple<int, int, tuple<str>>>
+        (square, line, shared) for every square and line (row, column or
+        diagonal) sharing more than one box, with the squares and lines given
+        as positions in `unitlist`. The box/line interactions of pointing pairs
+        and box/line reduction only happen there.
+    """
+    __slots__ = ('size', 'side', 'rows', 'cols', 'digits', 'diagonal', 'boxes', 'unitlist', 'units',
+                 'peers', 'index', 'unit_indices', 'peer_indices', 'box_units', 'intersections')
+
+    def __init__(self, diagonal, size=3):
+        side = size * size
+        if not 2 <= side <= len(DIGIT_LABELS):
+            raise ValueError("Unsupported board size: {}".format(size))
+        rows = tuple(ROW_LABELS[:side])
+        cols = tuple(str(c + 1) for c in range(side))
+        boxes = cross(rows, cols)
+
+        row_units = [cross([r], cols) for r in rows]
+        column_units = [cross(rows, [c]) for c in cols]
+        row_bands = [rows[i:i + size] for i in range(0, side, size)]
+        col_stacks = [cols[i:i + size] for i in range(0, side, size)]
+        square_units = [cross(rs, cs) for rs in row_bands for cs in col_stacks]
+        unitlist = row_units + column_units + square_units
+        if diagonal:
+            diagonal_units_a = [[rows[i] + cols[i] for i in range(len(rows))]]
+            diagonal_units_b = [[rows[len(rows) - 1 - i] + cols[i] for i in range(len(rows))]]
+            unitlist += diagonal_units_a + diagonal_units_b
+        unitlist = tuple(tuple(u) for u in unitlist)
+
+        first_square = len(row_units) + len(column_units)
+        squares = range(first_square, first_square + len(square_units))
+        lines = [u for u in range(len(unitlist)) if u not in squares]
+        intersections = []
+        for q in squares:
+            for l in lines:
+                shared = tuple(s for s in unitlist[l] if s in unitlist[q])
+                if len(shared) > 1:
+                    intersections.append((q, l, shared))
+
+        units = dict((s, tuple(u for u in unitlist if s in u)) for s in boxes)
+        peers = {}
+        for s in boxes:
+            # Keep the peers in unit order rather than set order, so every
+            # strategy visits them deterministically
+            seen = []
+            for u in units[s]:
+                seen.extend(p for p in u if p != s and p not in seen)
+            peers[s] = tuple(seen)
+        index = dict((s, i) for i, s in enumerate(boxes))
+
+        set_slot = object.__setattr__
+        set_slot(self, 'size', size)
+        set_slot(self, 'side', side)
+        set_slot(self, 'rows', rows)
+        set_slot(self, 'cols', cols)
+        set_slot(self, 'digits', DIGIT_LABELS[:side])
+        set_slot(self, 'diagonal', diagonal)
+        set_slot(self, 'boxes', tuple(boxes))
+        set_slot(self, 'unitlist', unitlist)
+        set_slot(self, 'units', MappingProxyType(units))
+        set_slot(self, 'peers', MappingProxyType(peers))
+        set_slot(self, 'index', MappingProxyType(index))
+        set_slot(self, 'unit_indices', tuple(tuple(index[s] for s in u) for u in unitlist))
+        set_slot(self, 'peer_indices', tuple(tuple(index[p] for p in peers[s]) for s in boxes))
+        set_slot(self, 'box_units', tuple(tuple(u for u, unit in enumerate(unitlist) if s in unit) for s in boxes))
+        set_slot(self, 'intersections', tuple(intersections))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Topology is immutable")
+
+    def __reduce__(self):
+        # Unpickle to the cached instance of the receiving process
+        return get_topology, (self.diagonal, self.size)
+
+    def __repr__(self):
+        return "Topology(diagonal={}, size={})".format(self.diagonal, self.size)
+
+
+_topologies = {}
+
+
+def get_topology(diagonal=True, size=3):
+    """
+    Return the shared Topology for a variant.
+    Args:
+        diagonal(bool): also constrain the two main diagonals.
+        size(int): the width of a square; 3 for 9x9 boards, 4 for 16x16, 5 for 25x25.
+    """
+    key = (bool(diagonal), size)
+    if key not in _topologies:
+        _topologies[key] = Topology(*key)
+    return _topologies[key]
+
+
+STANDARD = get_topology(diagonal=False)
+DIAGONAL = get_topology(diagonal=True)
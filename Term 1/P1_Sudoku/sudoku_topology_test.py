@@ -0,0 +1,56 @@
+import pickle
+import sudoku_topology
+import unittest
+
+
+class TestTopology(unittest.TestCase):
+
+    def test_cached(self):
+        self.assertIs(sudoku_topology.get_topology(True), sudoku_topology.DIAGONAL)
+        self.assertIs(sudoku_topology.get_topology(False), sudoku_topology.STANDARD)
+
+    def test_units_and_peers(self):
+        self.assertEqual(len(sudoku_topology.STANDARD.unitlist), 27)
+        self.assertEqual(len(sudoku_topology.DIAGONAL.unitlist), 29)
+        self.assertEqual(len(sudoku_topology.STANDARD.peers['A1']), 20)
+        self.assertEqual(len(sudoku_topology.DIAGONAL.peers['A1']), 26)
+        self.assertEqual(len(sudoku_topology.DIAGONAL.peers['A2']), 20)
+
+    def test_intersections(self):
+        self.assertEqual(len(sudoku_topology.STANDARD.intersections), 54)
+        # The diagonals cross three squares each
+        self.assertEqual(len(sudoku_topology.DIAGONAL.intersections), 60)
+        for square, line, shared in sudoku_topology.DIAGONAL.intersections:
+            self.assertEqual(len(shared), 3)
+            self.assertTrue(set(shared) <= set(sudoku_topology.DIAGONAL.unitlist[square]))
+
+    def test_index_tables(self):
+        topology = sudoku_topology.DIAGONAL
+        for box, peers in zip(topology.boxes, topology.peer_indices):
+            self.assertEqual([topology.boxes[i] for i in peers], list(topology.peers[box]))
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            sudoku_topology.DIAGONAL.boxes = ()
+        with self.assertRaises(TypeError):
+            sudoku_topology.DIAGONAL.peers['A1'] = ()
+
+    def test_pickle(self):
+        self.assertIs(pickle.loads(pickle.dumps(sudoku_topology.DIAGONAL)), sudoku_topology.DIAGONAL)
+        big = sudoku_topology.get_topology(False, 4)
+        self.assertIs(pickle.loads(pickle.dumps(big)), big)
+
+    def test_sizes(self):
+        for size in (2, 4, 5):
+            topology = sudoku_topology.get_topology(False, size)
+            side = size * size
+            self.assertEqual(len(topology.boxes), side * side)
+            self.assertEqual(len(topology.digits), side)
+            self.assertEqual(len(topology.unitlist), 3 * side)
+            self.assertEqual(len(topology.peers[topology.boxes[0]]), 3 * side - 2 * size - 1)
+        self.assertEqual(sudoku_topology.get_topology(False, 4).cols[-1], '16')
+        with self.assertRaises(ValueError):
+            sudoku_topology.get_topology(False, 6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,24 @@
 from PySudoku import play
 
-def visualize_assignments(assignments):
-    """ Visualizes the set of assignments created by the Sudoku AI"""
-    last_assignment = None
-    filtered_assignments = []
+def visualize_assignments(recorder, **kwargs):
+    """ Visualizes the set of assignments created by the Sudoku AI
+    Keyword arguments (fps, step, headless, output) are handed to PySudoku.play().
+    Raises ValueError for a recorder in 'off' mode, which has nothing to show."""
+    if recorder.mode == 'off':
+        raise ValueError("An 'off' recorder records no assignments to visualize")
+    if recorder.mode == 'ring':
+        return play(list(recorder.frames), **kwargs)
 
-    for i in range(len(assignments)):
-        if last_assignment:
-            last_assignment_items = [item for item in last_assignment.items() if len(item[1]) == 1]
-            current_assignment_items = [item for item in assignments[i].items() if len(item[1]) == 1]
-            shared_items = set(last_assignment_items) & set(current_assignment_items)
-            if len(shared_items) < len(current_assignment_items):
-                filtered_assignments.append(assignments[i])
-        last_assignment = assignments[i]
+    # Replay the (box, value) deltas on top of the starting grid, keeping a
+    # frame for every box whose shown value actually changes; only solved boxes
+    # are shown, so putting back one unsolved value over another is skipped
+    values = dict(recorder.initial)
+    filtered_assignments = []
+    for box, value in recorder.frames:
+        if values[box] != value:
+            shown = len(values[box]) == 1 or len(value) == 1
+            values[box] = value
+            if shown:
+                filtered_assignments.append(values.copy())
 
-    play(filtered_assignments)
+    return play(filtered_assignments, **kwargs)
@@ -3,6 +3,8 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import random
+import timeit
 import unittest
 
 import isolation
@@ -21,5 +23,120 @@ class IsolationTest(unittest.TestCase):
         self.game = isolation.Board(self.player1, self.player2)
 
 
+class InPlaceSearchTest(unittest.TestCase):
+    """Searching in place must find the same moves as searching on copies."""
+
+    def search(self, cls, player, method, depth):
+        board = cls(player, "Player2")
+        board.apply_move((3, 3))
+        board.apply_move((2, 4))
+        before = board.to_string()
+        player.time_left = lambda: float("inf")
+        random.seed(0)
+        move = getattr(player, method)(board, depth)
+        self.assertEqual(board.to_string(), before)
+        return move
+
+    def test_same_moves(self):
+        for cls in (isolation.Board, isolation.BitBoard):
+            for player_cls, method in ((game_agent.MinimaxPlayer, 'minimax'),
+                                       (game_agent.AlphaBetaPlayer, 'alphabeta')):
+                self.assertEqual(self.search(cls, player_cls(in_place=True), method, 4),
+                                 self.search(cls, player_cls(), method, 4))
+
+    def test_timeout_restores_board(self):
+        player = game_agent.AlphaBetaPlayer(in_place=True)
+        board = isolation.BitBoard(player, "Player2")
+        board.apply_move((3, 3))
+        board.apply_move((2, 4))
+        before = board.to_string()
+        calls = iter(range(200))
+        move = player.get_move(board, lambda: 1000 if next(calls, None) is not None else 0)
+        self.assertIn(move, board.get_legal_moves())
+        self.assertEqual(board.to_string(), before)
+        self.assertEqual(board._move_stack, [])
+
+
+class TranspositionTableTest(unittest.TestCase):
+    """The table must keep its bounds straight and never change a search value."""
+
+    def test_probe(self):
+        tt = game_agent.TranspositionTable(8)
+        tt.store(3, 2, 5., game_agent.TranspositionTable.LOWER, (1, 2))
+        self.assertEqual(tt.probe(3, 2, 0., 4.), (5., (1, 2)))
+        self.assertEqual(tt.probe(3, 2, 0., 6.), (None, (1, 2)))
+        self.assertEqual(tt.probe(3, 3, 0., 4.), (None, (1, 2)))
+        self.assertEqual(tt.probe(11, 1, 0., 4.), (None, None))
+
+    def test_replacement(self):
+        tt = game_agent.TranspositionTable(8)
+        tt.store(3, 4, 1., game_agent.TranspositionTable.EXACT, (1, 2))
+        # a shallower result of another position does not evict a deeper one
+        tt.store(11, 2, 1., game_agent.TranspositionTable.EXACT, (2, 1))
+        self.assertEqual(tt.probe(3, 4, 0., 2.)[0], 1.)
+        # unless the deeper one is left from an earlier search
+        tt.new_search()
+        tt.store(11, 2, 1., game_agent.TranspositionTable.EXACT, (2, 1))
+        self.assertEqual(tt.probe(3, 1, 0., 2.), (None, None))
+        self.assertEqual(len(tt.slots), 8)
+
+    def test_same_values(self):
+        rng = random.Random(0)
+        inf = float("inf")
+        for _ in range(10):
+            players = [game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_2),
+                       game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_2, tt_size=1024)]
+            boards = [isolation.BitBoard(player, "Player2", shuffle=False) for player in players]
+            for _ in range(2 * rng.randrange(1, 6)):
+                if not boards[0].get_legal_moves():
+                    break
+                move = rng.choice(boards[0].get_legal_moves())
+                for board in boards:
+                    board.apply_move(move)
+            if boards[0].active_player != players[0] or not boards[0].get_legal_moves():
+                continue
+            for depth in range(1, 6):
+                values = []
+                for player, board in zip(players, boards):
+                    player.time_left = lambda: inf
+                    values.append(player.abmax(board, depth, -inf, inf))
+                self.assertEqual(values[0], values[1])
+
+    def test_seat_swap(self):
+        inf = float("inf")
+        player = game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_2, tt_size=1024)
+        player.time_left = lambda: inf
+        first = isolation.BitBoard(player, "Player2", shuffle=False)
+        first.apply_move((3, 3))
+        first.apply_move((2, 4))
+        for depth in range(1, 6):
+            player.alphabeta(first, depth)
+        # The same positions with the seats swapped hash the same, but are
+        # worth the opposite to the player
+        for move in first.get_legal_moves():
+            fresh = game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_2)
+            fresh.time_left = lambda: inf
+            boards = [isolation.BitBoard("Player2", p, shuffle=False) for p in (player, fresh)]
+            for board in boards:
+                for m in ((3, 3), (2, 4), move):
+                    board.apply_move(m)
+            self.assertEqual(boards[0].hash(), first.forecast_move(move).hash())
+            for depth in range(1, 5):
+                player.alphabeta(boards[0], depth)
+                self.assertEqual(player.abmax(boards[0], depth, -inf, inf),
+                                 fresh.abmax(boards[1], depth, -inf, inf))
+
+    def test_get_move(self):
+        player = game_agent.AlphaBetaPlayer(tt_size=1024, in_place=True)
+        board = isolation.Board(player, "Player2")
+        board.apply_move((3, 3))
+        board.apply_move((2, 4))
+        start = timeit.default_timer()
+        move = player.get_move(board, lambda: 150 - 1000 * (timeit.default_timer() - start))
+        self.assertIn(move, board.get_legal_moves())
+        self.assertEqual(player.tt.generation, 1)
+        self.assertTrue(any(player.tt.slots))
+
+
 if __name__ == '__main__':
     unittest.main()
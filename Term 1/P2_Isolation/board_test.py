@@ -0,0 +1,155 @@
+"""Unit tests for the isolation board implementations."""
+
+import random
+import unittest
+
+import isolation
+import game_agent
+from sample_players import GreedyPlayer, RandomPlayer
+
+
+class BitBoardTest(unittest.TestCase):
+    """The BitBoard must agree with the reference Board on every position."""
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def assertSameState(self, board, bitboard):
+        for player in (self.player1, self.player2):
+            self.assertEqual(sorted(board.get_legal_moves(player)), sorted(bitboard.get_legal_moves(player)))
+            self.assertEqual(board.get_player_location(player), bitboard.get_player_location(player))
+            self.assertEqual(board.utility(player), bitboard.utility(player))
+            self.assertEqual(board.is_winner(player), bitboard.is_winner(player))
+        self.assertEqual(board.get_blank_spaces(), bitboard.get_blank_spaces())
+        self.assertEqual(board.active_player, bitboard.active_player)
+        self.assertEqual(board.move_count, bitboard.move_count)
+        self.assertEqual(board.to_string(), bitboard.to_string())
+
+    def test_random_games(self):
+        rng = random.Random(0)
+        for width, height in ((7, 7), (5, 8)):
+            for _ in range(20):
+                board = isolation.Board(self.player1, self.player2, width, height)
+                bitboard = isolation.BitBoard(self.player1, self.player2, width, height)
+                self.assertSameState(board, bitboard)
+                while board.get_legal_moves():
+                    move = rng.choice(sorted(board.get_legal_moves()))
+                    self.assertTrue(bitboard.move_is_legal(move))
+                    board.apply_move(move)
+                    bitboard = bitboard.forecast_move(move)
+                    self.assertSameState(board, bitboard)
+                    self.assertFalse(bitboard.move_is_legal(move))
+
+    def test_copy_is_independent(self):
+        bitboard = isolation.BitBoard(self.player1, self.player2)
+        bitboard.apply_move((3, 3))
+        child = bitboard.forecast_move((0, 0))
+        self.assertEqual(len(bitboard.get_blank_spaces()), 48)
+        self.assertEqual(len(child.get_blank_spaces()), 47)
+        self.assertNotEqual(bitboard.hash(), child.hash())
+        self.assertEqual(child.hash(), bitboard.forecast_move((0, 0)).hash())
+
+    def test_play(self):
+        for player in (GreedyPlayer(), game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score)):
+            bitboard = isolation.BitBoard(player, RandomPlayer())
+            winner, history, outcome = bitboard.play()
+            self.assertIn(winner, (bitboard.active_player, bitboard.inactive_player))
+            self.assertTrue(history)
+
+
+class ZobristTest(unittest.TestCase):
+    """The incremental hash must equal the hash computed from scratch."""
+
+    def full_hash(self, board):
+        blocked, locations, side = isolation.isolation.zobrist_keys(board.width, board.height)
+        blanks = set(board.get_blank_spaces())
+        h = 0
+        for idx in range(board.width * board.height):
+            if (idx % board.height, idx // board.height) not in blanks:
+                h ^= blocked[idx]
+        for keys, player in zip(locations, ("Player1", "Player2")):
+            loc = board.get_player_location(player)
+            if loc is not None:
+                h ^= keys[loc[0] + loc[1] * board.height]
+        if board.active_player == "Player2":
+            h ^= side
+        return h
+
+    def test_incremental(self):
+        rng = random.Random(6)
+        board = isolation.Board("Player1", "Player2")
+        bitboard = isolation.BitBoard("Player1", "Player2")
+        seen = set()
+        while board.get_legal_moves():
+            self.assertEqual(board.hash(), self.full_hash(board))
+            self.assertEqual(bitboard.hash(), board.hash())
+            self.assertNotIn(board.hash(), seen)
+            seen.add(board.hash())
+            move = rng.choice(sorted(board.get_legal_moves()))
+            board.apply_move(move)
+            bitboard.push(move)
+
+
+class MoveOrderTest(unittest.TestCase):
+    """Move order is fixed without shuffling, and reproducible with a seed."""
+
+    def play_out(self, board, rng):
+        history = []
+        while board.get_legal_moves():
+            moves = board.get_legal_moves()
+            history.append(moves)
+            board.apply_move(moves[rng.randrange(len(moves))])
+        return history
+
+    def test_deterministic(self):
+        games = [self.play_out(cls("Player1", "Player2", shuffle=False), random.Random(2))
+                 for cls in (isolation.Board, isolation.BitBoard, isolation.BitBoard)]
+        self.assertEqual(games[0], games[1])
+        self.assertEqual(games[1], games[2])
+
+    def test_seeded(self):
+        for cls in (isolation.Board, isolation.BitBoard):
+            first = self.play_out(cls("Player1", "Player2", seed=3), random.Random(4))
+            random.seed(5)
+            self.assertEqual(self.play_out(cls("Player1", "Player2", seed=3), random.Random(4)), first)
+
+    def test_copies_share_generator(self):
+        for cls in (isolation.Board, isolation.BitBoard):
+            board = cls("Player1", "Player2", shuffle=False, seed=1)
+            child = board.forecast_move((3, 3))
+            self.assertIs(child._rng, board._rng)
+            self.assertFalse(child._shuffle)
+
+
+class PushPopTest(unittest.TestCase):
+    """push() and pop() must undo exactly, on both board implementations."""
+
+    def test_push_pop(self):
+        rng = random.Random(1)
+        for cls in (isolation.Board, isolation.BitBoard):
+            board = cls("Player1", "Player2")
+            states = []
+            while board.get_legal_moves():
+                states.append((board.to_string(), board.hash(), board.move_count, board.active_player,
+                               sorted(board.get_legal_moves())))
+                board.push(rng.choice(sorted(board.get_legal_moves())))
+            while states:
+                board.pop()
+                self.assertEqual((board.to_string(), board.hash(), board.move_count, board.active_player,
+                                  sorted(board.get_legal_moves())), states.pop())
+            with self.assertRaises(IndexError):
+                board.pop()
+
+    def test_push_matches_forecast(self):
+        for cls in (isolation.Board, isolation.BitBoard):
+            board = cls("Player1", "Player2")
+            board.apply_move((3, 3))
+            forecast = board.forecast_move((1, 2))
+            board.push((1, 2))
+            self.assertEqual(board.to_string(), forecast.to_string())
+            self.assertEqual(board.hash(), forecast.hash())
+
+
+if __name__ == '__main__':
+    unittest.main()
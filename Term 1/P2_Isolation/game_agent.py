@@ -133,6 +133,92 @@ def custom_score_3(game, player):
     return 1/float(score)
 
 
+def child_value(game, move, in_place, search, *args):
+    """Return search(child, *args) for the child of game after move.
+
+    With in_place set the move is pushed onto game and popped again afterwards,
+    even if the search times out, so no board is allocated for the child;
+    otherwise the child is a copy from game.forecast_move().
+    """
+    if not in_place:
+        return search(game.forecast_move(move), *args)
+    game.push(move)
+    try:
+        return search(game, *args)
+    finally:
+        game.pop()
+
+
+class TranspositionTable(object):
+    """A fixed-size table of alpha-beta search results, indexed by board hash.
+
+    Every slot holds at most one entry (key, depth, value, bound, move,
+    generation): the full hash of the position, the depth it was searched to,
+    its value from the searching player's point of view, whether that value is
+    EXACT or only a LOWER or UPPER bound (after a cutoff), the best move found,
+    and the search it was stored in. When two positions meet in a slot, the
+    deeper result of the current search stays; results of earlier searches and
+    older results for the same position are always replaced.
+
+    A hash tells the seats apart but not which of them the searching player
+    holds, so a table must only ever be filled from one seat (see
+    `AlphaBetaPlayer.alphabeta`). Within a seat, values depend on the position
+    alone, so probe() also uses the results of earlier searches.
+
+    Parameters
+    ----------
+    size : int
+        The number of slots; memory stays bounded however long the game.
+    """
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, size=2 ** 16):
+        self.size = size
+        self.slots = [None] * size
+        self.generation = 0
+
+    def new_search(self):
+        """Age the stored entries, so the next search replaces them first."""
+        self.generation += 1
+
+    def clear(self):
+        """Drop every stored entry."""
+        self.slots = [None] * self.size
+
+    def probe(self, key, depth, alpha, beta):
+        """Return (value, move) for the position with hash key: the stored value
+        if it settles a search to depth within (alpha, beta), else None, and the
+        stored best move, None if there is no entry.
+        """
+        entry = self.slots[key % self.size]
+        if entry is None or entry[0] != key:
+            return None, None
+        _, stored_depth, value, bound, move, _ = entry
+        if stored_depth >= depth and (bound == self.EXACT or
+                                      (bound == self.LOWER and value >= beta) or
+                                      (bound == self.UPPER and value <= alpha)):
+            return value, move
+        return None, move
+
+    def store(self, key, depth, value, bound, move):
+        """Store the result of searching the position with hash key to depth."""
+        index = key % self.size
+        entry = self.slots[index]
+        if (entry is None or entry[0] == key or entry[5] != self.generation or
+                depth >= entry[1]):
+            self.slots[index] = (key, depth, value, bound, move, self.generation)
+
+
+def first(moves, move):
+    """Move a legal move to the front of moves, e.g. the best move stored in
+    the transposition table, so it is searched first.
+    """
+    if move is not None and move in moves:
+        moves.remove(move)
+        moves.insert(0, move)
+    return moves
+
+
 class IsolationPlayer:
     """Base class for minimax and alphabeta agents -- this class is never
     constructed or tested directly.
@@ -166,7 +252,19 @@ class MinimaxPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using depth-limited minimax
     search. You must finish and test this player to make sure it properly uses
     minimax to return a good move before the search time limit expires.
+
+    Parameters
+    ----------
+    in_place : bool (optional)
+        Search by pushing and popping moves on the board passed to get_move()
+        (see `Board.push`) instead of forecasting a copy of it at every node.
+        The board is left as it was found when get_move() returns.
+
+    See IsolationPlayer for the other parameters.
     """
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10., in_place=False):
+        IsolationPlayer.__init__(self, search_depth, score_fn, timeout)
+        self.in_place = in_place
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -272,10 +370,8 @@ class MinimaxPlayer(IsolationPlayer):
         # loop through each move
         # choose the move that has the max value after starting the recursion through mmin
         for move in legal_moves:
-            # get the forecasted board for the child node
-            f_game = game.forecast_move(move)
             # get the minimum value for the current child nodes (recursively)
-            val = self.mmin(f_game, depth-1)
+            val = child_value(game, move, self.in_place, self.mmin, depth-1)
             # get the maximum of the best val and the found val
             # replace best val and best move
             if val > best_val:
@@ -308,10 +404,8 @@ class MinimaxPlayer(IsolationPlayer):
 
         # loop through all the child nodes
         for move in legal_moves:
-            # get the forecasted board for the child node
-            f_game = game.forecast_move(move)
             # get the minimum value for the subsequent child nodes (recursively)
-            val = self.mmin(f_game,depth-1)
+            val = child_value(game, move, self.in_place, self.mmin, depth-1)
             # get the maximum of the best val and the found val
             best_val = max(val, best_val)
 
@@ -342,10 +436,8 @@ class MinimaxPlayer(IsolationPlayer):
 
         # loop through all the child nodes
         for move in legal_moves:
-            # get the forecasted board for the child node
-            f_game = game.forecast_move(move)
             # get the maximum value for the subsequent child nodes (recursively)
-            val = self.mmax(f_game, depth-1)
+            val = child_value(game, move, self.in_place, self.mmax, depth-1)
             # get the min of the best val and the found val
             best_val = min(val, best_val)
 
@@ -357,7 +449,29 @@ class AlphaBetaPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning. You must finish and test this player to
     make sure it returns a good move before the search time limit expires.
+
+    Parameters
+    ----------
+    in_place : bool (optional)
+        Search by pushing and popping moves on the board passed to get_move()
+        (see `Board.push`) instead of forecasting a copy of it at every node.
+        The board is left as it was found when get_move() returns.
+
+    tt_size : int (optional)
+        The number of slots of a TranspositionTable kept across the iterative
+        deepening passes of get_move() and across moves; 0 searches without one.
+        Needs a board whose hash() is cheap, such as the Zobrist hash of
+        `isolation.Board`. The table is cleared whenever the player searches
+        from the other seat than before, e.g. when a tournament swaps seats.
+
+    See IsolationPlayer for the other parameters.
     """
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10., in_place=False, tt_size=0):
+        IsolationPlayer.__init__(self, search_depth, score_fn, timeout)
+        self.in_place = in_place
+        self.tt = TranspositionTable(tt_size) if tt_size else None
+        # The seat (0 or 1) the entries of the table were searched from
+        self.tt_seat = None
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -395,6 +509,10 @@ class AlphaBetaPlayer(IsolationPlayer):
         # in case the search fails due to timeout
         best_move = (-1, -1)
 
+        # let this search replace the entries of the previous ones first
+        if self.tt is not None:
+            self.tt.new_search()
+
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
@@ -406,8 +524,11 @@ class AlphaBetaPlayer(IsolationPlayer):
                 best_move = self.alphabeta(game, pli)
                 # increment the depth
                 pli += 1
+                # stop if there is no legal move to search deeper for
+                if best_move == (-1, -1):
+                    break
                 # get best value
-                best_val =self.score(game.forecast_move(best_move),self)
+                best_val = child_value(game, best_move, self.in_place, self.score, self)
                 # if val reaches infinity, break the loop
                 if best_val == float('inf') or best_val == float('-inf'):
                     break
@@ -482,13 +603,22 @@ class AlphaBetaPlayer(IsolationPlayer):
         if not legal_moves:
             return best_move
 
+        if self.tt is not None:
+            # Stored values are from this player's point of view, which the hash
+            # does not tell apart from the other seat's; the player to move at the
+            # root is this one, so the seat follows from the number of moves made
+            seat = game.move_count % 2
+            if seat != self.tt_seat:
+                self.tt.clear()
+                self.tt_seat = seat
+            # search the best move of the previous iteration first
+            first(legal_moves, self.tt.probe(game.hash(), depth, alpha, beta)[1])
+
         # loop through each move
         # choose the move that has the max value after starting the recursion through mmin
         for move in legal_moves:
-            # get the forecasted board for the child node
-            f_game = game.forecast_move(move)
             # get the minimum value for the current child nodes (recursively)
-            val = self.abmin(f_game, depth-1, alpha, beta)
+            val = child_value(game, move, self.in_place, self.abmin, depth-1, alpha, beta)
             # update alpha for pruning
             alpha = max(alpha, val)
             # get the maximum of the best val and the found val
@@ -497,6 +627,7 @@ class AlphaBetaPlayer(IsolationPlayer):
                 best_val = val
                 best_move = move
 
+        self.store(game, depth, best_val, TranspositionTable.EXACT, best_move)
         return best_move
 
     def abmax(self, game, depth, alpha, beta):
@@ -525,6 +656,14 @@ class AlphaBetaPlayer(IsolationPlayer):
             # return the score of the terminal node
             return self.score(game, self)
 
+        # reuse a stored result, or at least search the stored best move first
+        if self.tt is not None:
+            val, tt_move = self.tt.probe(game.hash(), depth, alpha, beta)
+            if val is not None:
+                return val
+            first(legal_moves, tt_move)
+        alpha_orig = alpha
+
         # set the best value to negative infinity
         best_val = float('-inf')
         # create a generic best move
@@ -532,18 +671,21 @@ class AlphaBetaPlayer(IsolationPlayer):
 
         # loop through all the child nodes
         for move in legal_moves:
-            # get the forecasted board for the child node
-            f_game = game.forecast_move(move)
             # get the minimum value for the subsequent child nodes (recursively)
-            val = self.abmin(f_game, depth - 1, alpha, beta)
+            val = child_value(game, move, self.in_place, self.abmin, depth - 1, alpha, beta)
             # get the maximum of the best val and the found val
             if val > best_val:
                 best_val = val
+                best_move = move
             #best_val = max(val, best_val)
             # if best_val is greater than or equal to beta
             if best_val >= beta:
+                self.store(game, depth, best_val, TranspositionTable.LOWER, best_move)
                 return best_val
             alpha = max(alpha, best_val)
+        # no move raising alpha only bounds the value from above
+        bound = TranspositionTable.UPPER if best_val <= alpha_orig else TranspositionTable.EXACT
+        self.store(game, depth, best_val, bound, best_move)
         # return the best value
         return best_val
 
@@ -573,6 +715,14 @@ class AlphaBetaPlayer(IsolationPlayer):
             # return the score of the terminal node
             return self.score(game, self)
 
+        # reuse a stored result, or at least search the stored best move first
+        if self.tt is not None:
+            val, tt_move = self.tt.probe(game.hash(), depth, alpha, beta)
+            if val is not None:
+                return val
+            first(legal_moves, tt_move)
+        beta_orig = beta
+
         # set the best value to positive infinity
         best_val = float('inf')
         # create a generic best move
@@ -580,18 +730,26 @@ class AlphaBetaPlayer(IsolationPlayer):
 
         # loop through all the child nodes
         for move in legal_moves:
-            # get the forecasted board for the child node
-            f_game = game.forecast_move(move)
             # get the maximum value for the subsequent child nodes (recursively)
-            val = self.abmax(f_game, depth - 1, alpha, beta)
+            val = child_value(game, move, self.in_place, self.abmax, depth - 1, alpha, beta)
             # get the min of the best val and the found val
             if val < best_val:
                 best_val = val
+                best_move = move
             #best_val = min(val, best_val)
             # if best_val is less than or equal to alpha
             if best_val <= alpha:
                 # return the best value and best move
+                self.store(game, depth, best_val, TranspositionTable.UPPER, best_move)
                 return best_val
             beta = min(beta, best_val)
+        # no move lowering beta only bounds the value from below
+        bound = TranspositionTable.LOWER if best_val >= beta_orig else TranspositionTable.EXACT
+        self.store(game, depth, best_val, bound, best_move)
         # return the best value and best move
         return best_val
+
+    def store(self, game, depth, value, bound, move):
+        """Store a search result in the transposition table, if there is one."""
+        if self.tt is not None:
+            self.tt.store(game.hash(), depth, value, bound, move)
@@ -0,0 +1,300 @@
+"""
+This file contains the `BitBoard` class, a drop-in replacement for `Board`
+that keeps the game state in a few ints instead of a list.
+
+Bit `idx` of the `_blanks` mask is set while the square at index
+`idx = row + column * height` (the same indexing as `Board`) is open. The knight
+moves out of every square are precomputed as masks once per board size, so the
+legal moves of a player are a single mask-and (plus a lookup of the move list
+of that mask), and copying a board copies the mask and the two player locations.
+"""
+import random
+
+from .isolation import Board, zobrist_keys
+
+# Knight moves in the order Board.__get_moves tries them
+_DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+               (1, -2), (1, 2), (2, -1), (2, 1)]
+
+_tables = {}
+
+
+def _board_tables(width, height):
+    """Return the (knight move masks, square coordinates, move lists) of a board
+    size, each indexed by square and built once per size. The move lists of a
+    square map a mask of its open knight moves to the list of those moves, in
+    the order `Board` generates them; they fill in as they are met, and are
+    bounded by 2 ** 8 masks per square.
+    """
+    if (width, height) not in _tables:
+        squares = [(idx % height, idx // height) for idx in range(width * height)]
+        knight_masks = []
+        for r, c in squares:
+            mask = 0
+            for dr, dc in _DIRECTIONS:
+                if 0 <= r + dr < height and 0 <= c + dc < width:
+                    mask |= 1 << (r + dr + (c + dc) * height)
+            knight_masks.append(mask)
+        _tables[(width, height)] = (knight_masks, squares, [{} for _ in squares])
+    return _tables[(width, height)]
+
+
+class BitBoard(Board):
+    """Implement a model for the game Isolation assuming each player moves like
+    a knight in chess, with the same interface as `Board`.
+
+    Parameters
+    ----------
+    player_1 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    player_2 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    width : int (optional)
+        The number of columns that the board should have.
+
+    height : int (optional)
+        The number of rows that the board should have.
+
+    shuffle : bool (optional)
+        Return legal moves in random order; with False they come in the same
+        fixed order as from `Board`.
+
+    seed : int (optional)
+        Shuffle with a private random.Random(seed), shared with copies.
+    """
+
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle=True, seed=None):
+        self.width = width
+        self.height = height
+        self.move_count = 0
+        self._player_1 = player_1
+        self._player_2 = player_2
+        self._active_player = player_1
+        self._inactive_player = player_2
+        self._shuffle = shuffle
+        self._rng = random if seed is None else random.Random(seed)
+
+        self._knight_masks, self._squares, self._move_lists = _board_tables(width, height)
+        # Open squares, and the square index of each player (None until it moves)
+        self._blanks = (1 << (width * height)) - 1
+        self._p1_loc = Board.NOT_MOVED
+        self._p2_loc = Board.NOT_MOVED
+
+        # Zobrist hash of the position, the same as Board.hash() for the same position
+        self._zobrist_keys = zobrist_keys(width, height)
+        self._hash = 0
+
+        # The (blanks, location, hash) before each push(), for pop()
+        self._move_stack = []
+
+    def hash(self):
+        """Return the Zobrist hash of the current position, see zobrist_keys()."""
+        return self._hash
+
+    def copy(self):
+        """ Return a deep copy of the current board. """
+        # Skip __init__, which would build a fresh blank mask only to overwrite it
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.width = self.width
+        new_board.height = self.height
+        new_board.move_count = self.move_count
+        new_board._player_1 = self._player_1
+        new_board._player_2 = self._player_2
+        new_board._active_player = self._active_player
+        new_board._inactive_player = self._inactive_player
+        new_board._shuffle = self._shuffle
+        new_board._rng = self._rng
+        new_board._knight_masks = self._knight_masks
+        new_board._squares = self._squares
+        new_board._move_lists = self._move_lists
+        new_board._blanks = self._blanks
+        new_board._p1_loc = self._p1_loc
+        new_board._p2_loc = self._p2_loc
+        new_board._zobrist_keys = self._zobrist_keys
+        new_board._hash = self._hash
+        new_board._move_stack = []
+        return new_board
+
+    def move_is_legal(self, move):
+        """Test whether a move is legal in the current game state.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+
+        Returns
+        -------
+        bool
+            Returns True if the move is legal, False otherwise
+        """
+        return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
+                bool(self._blanks >> (move[0] + move[1] * self.height) & 1))
+
+    def get_blank_spaces(self):
+        """Return a list of the locations that are still available on the board.
+        """
+        return self._mask_squares(self._blanks)
+
+    def get_player_location(self, player):
+        """Find the current location of the specified player on the board.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        Returns
+        -------
+        (int, int) or None
+            The coordinate pair (row, column) of the input player, or None
+            if the player has not moved.
+        """
+        if player == self._player_1:
+            idx = self._p1_loc
+        elif player == self._player_2:
+            idx = self._p2_loc
+        else:
+            raise RuntimeError(
+                "Invalid player in get_player_location: {}".format(player))
+        if idx == Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return self._squares[idx]
+
+    def get_legal_moves(self, player=None):
+        """Return the list of all legal moves for the specified player.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            return the legal moves for the active player on the board.
+
+        Returns
+        -------
+        list<(int, int)>
+            The list of coordinate pairs (row, column) of all legal moves
+            for the player constrained by the current game state.
+        """
+        if player is None:
+            player = self._active_player
+        if player == self._player_1:
+            idx = self._p1_loc
+        elif player == self._player_2:
+            idx = self._p2_loc
+        else:
+            raise RuntimeError(
+                "Invalid player in get_legal_moves: {}".format(player))
+        if idx == Board.NOT_MOVED:
+            return self.get_blank_spaces()
+        mask = self._knight_masks[idx] & self._blanks
+        moves = self._move_lists[idx].get(mask)
+        if moves is None:
+            moves = self._move_lists[idx][mask] = self._knight_moves(idx, mask)
+        valid_moves = moves[:]
+        if self._shuffle:
+            self._rng.shuffle(valid_moves)
+        return valid_moves
+
+    def apply_move(self, move):
+        """Move the active player to a specified location.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        idx = move[0] + move[1] * self.height
+        blocked, locations, side = self._zobrist_keys
+        if self._active_player == self._player_1:
+            location_keys, loc = locations[0], self._p1_loc
+            self._p1_loc = idx
+        else:
+            location_keys, loc = locations[1], self._p2_loc
+            self._p2_loc = idx
+        h = self._hash ^ side ^ location_keys[idx]
+        if loc != Board.NOT_MOVED:
+            h ^= location_keys[loc]
+        if self._blanks >> idx & 1:
+            h ^= blocked[idx]
+        self._hash = h
+        self._blanks &= ~(1 << idx)
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count += 1
+
+    def push(self, move):
+        """Apply a move in place, like apply_move(), remembering enough to undo
+        it with pop().
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        if self._active_player == self._player_1:
+            self._move_stack.append((self._blanks, self._p1_loc, self._hash))
+        else:
+            self._move_stack.append((self._blanks, self._p2_loc, self._hash))
+        self.apply_move(move)
+
+    def pop(self):
+        """Undo the last move applied with push().
+
+        Raises
+        ------
+        IndexError
+            If there is no pushed move left to undo.
+        """
+        self._blanks, loc, self._hash = self._move_stack.pop()
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+        if self._active_player == self._player_1:
+            self._p1_loc = loc
+        else:
+            self._p2_loc = loc
+
+    def to_string(self, symbols=['1', '2']):
+        """Generate a string representation of the current game state, marking
+        the location of each player and indicating which cells have been
+        blocked, and which remain open.
+        """
+        col_margin = len(str(self.height - 1)) + 1
+        prefix = "{:<" + "{}".format(col_margin) + "}"
+        offset = " " * (col_margin + 3)
+        out = offset + '   '.join(map(str, range(self.width))) + '\n\r'
+        for i in range(self.height):
+            out += prefix.format(i) + ' | '
+            for j in range(self.width):
+                idx = i + j * self.height
+                if self._blanks >> idx & 1:
+                    out += ' '
+                elif self._p1_loc == idx:
+                    out += symbols[0]
+                elif self._p2_loc == idx:
+                    out += symbols[1]
+                else:
+                    out += '-'
+                out += ' | '
+            out += '\n\r'
+
+        return out
+
+    def _knight_moves(self, idx, mask):
+        """Return the knight moves out of square idx that land in mask."""
+        r, c = self._squares[idx]
+        return [(r + dr, c + dc) for dr, dc in _DIRECTIONS
+                if 0 <= r + dr < self.height and 0 <= c + dc < self.width and
+                mask >> (r + dr + (c + dc) * self.height) & 1]
+
+    def _mask_squares(self, mask):
+        """Return the coordinates of the squares set in mask, in index order."""
+        squares = self._squares
+        # Reading the bits off the binary string beats shifting them out one by one
+        return [squares[idx] for idx, bit in enumerate(bin(mask)[:1:-1]) if bit == '1']
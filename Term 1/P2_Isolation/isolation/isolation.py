@@ -13,6 +13,25 @@ from copy import copy
 
 TIME_LIMIT_MILLIS = 150
 
+_zobrist_tables = {}
+
+
+def zobrist_keys(width, height):
+    """Return the random 64-bit Zobrist keys of a board size, built once per
+    size from a fixed seed so hashes are stable from run to run:
+    (blocked square keys, (player 1 location keys, player 2 location keys),
+    key of player 2 to move). The hash of a position is the XOR of the keys of
+    its blocked squares, of both player locations and, on player 2's turns,
+    the side to move key.
+    """
+    if (width, height) not in _zobrist_tables:
+        rng = random.Random(0x15014710)
+        squares = range(width * height)
+        blocked = [rng.getrandbits(64) for _ in squares]
+        locations = ([rng.getrandbits(64) for _ in squares], [rng.getrandbits(64) for _ in squares])
+        _zobrist_tables[(width, height)] = (blocked, locations, rng.getrandbits(64))
+    return _zobrist_tables[(width, height)]
+
 
 class Board(object):
     """Implement a model for the game Isolation assuming each player moves like
@@ -33,11 +52,21 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    shuffle : bool (optional)
+        Return legal moves in random order, as the reference board always has.
+        With False they come in a fixed order and the searches of deterministic
+        agents can be replayed exactly.
+
+    seed : int (optional)
+        Shuffle the legal moves with a private random.Random(seed) instead of
+        the global random module, so shuffled games are reproducible too.
+        Copies of the board share the generator.
     """
     BLANK = 0
     NOT_MOVED = None
 
-    def __init__(self, player_1, player_2, width=7, height=7):
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle=True, seed=None):
         self.width = width
         self.height = height
         self.move_count = 0
@@ -45,6 +74,8 @@ class Board(object):
         self._player_2 = player_2
         self._active_player = player_1
         self._inactive_player = player_2
+        self._shuffle = shuffle
+        self._rng = random if seed is None else random.Random(seed)
 
         # The last 3 entries of the board state includes initiative (0 for
         # player 1, 1 for player 2) player 2 last move, and player 1 last move
@@ -52,8 +83,16 @@ class Board(object):
         self._board_state[-1] = Board.NOT_MOVED
         self._board_state[-2] = Board.NOT_MOVED
 
+        # Zobrist hash of the position, kept up to date by apply_move()
+        self._zobrist_keys = zobrist_keys(width, height)
+        self._hash = 0
+
+        # What push() overwrote, for pop() to restore
+        self._move_stack = []
+
     def hash(self):
-        return str(self._board_state).__hash__()
+        """Return the Zobrist hash of the current position, see zobrist_keys()."""
+        return self._hash
 
     @property
     def active_player(self):
@@ -92,11 +131,14 @@ class Board(object):
 
     def copy(self):
         """ Return a deep copy of the current board. """
-        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height)
+        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height,
+                          shuffle=self._shuffle)
+        new_board._rng = self._rng
         new_board.move_count = self.move_count
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
         new_board._board_state = copy(self._board_state)
+        new_board._hash = self._hash
         return new_board
 
     def forecast_move(self, move):
@@ -202,12 +244,54 @@ class Board(object):
         """
         idx = move[0] + move[1] * self.height
         last_move_idx = int(self.active_player == self._player_2) + 1
+        blocked, locations, side = self._zobrist_keys
+        location_keys = locations[last_move_idx - 1]
+        # XOR out the old location and in the new one, the newly blocked square and the turn
+        h = self._hash ^ side ^ location_keys[idx]
+        if self._board_state[-last_move_idx] != Board.NOT_MOVED:
+            h ^= location_keys[self._board_state[-last_move_idx]]
+        if self._board_state[idx] == Board.BLANK:
+            h ^= blocked[idx]
+        self._hash = h
         self._board_state[-last_move_idx] = idx
         self._board_state[idx] = 1
         self._board_state[-3] ^= 1
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
 
+    def push(self, move):
+        """Apply a move in place, like apply_move(), remembering enough to undo
+        it with pop(). Searching with push() and pop() visits every node on the
+        same board instead of allocating a copy per node like forecast_move().
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        idx = move[0] + move[1] * self.height
+        last_move_idx = int(self.active_player == self._player_2) + 1
+        self._move_stack.append((idx, self._board_state[idx], self._board_state[-last_move_idx], self._hash))
+        self.apply_move(move)
+
+    def pop(self):
+        """Undo the last move applied with push().
+
+        Raises
+        ------
+        IndexError
+            If there is no pushed move left to undo; moves applied with
+            apply_move(), and those made before a copy(), cannot be undone.
+        """
+        idx, square, last_move, self._hash = self._move_stack.pop()
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+        last_move_idx = int(self.active_player == self._player_2) + 1
+        self._board_state[-last_move_idx] = last_move
+        self._board_state[idx] = square
+        self._board_state[-3] ^= 1
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
         return player == self._inactive_player and not self.get_legal_moves(self._active_player)
@@ -260,7 +344,8 @@ class Board(object):
                       (1, -2), (1, 2), (2, -1), (2, 1)]
         valid_moves = [(r + dr, c + dc) for dr, dc in directions
                        if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
+        if self._shuffle:
+            self._rng.shuffle(valid_moves)
         return valid_moves
 
     def print_board(self):